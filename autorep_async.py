@@ -0,0 +1,76 @@
+import asyncio
+from autorep_parser import parse_lines, to_timestamp
+from jobsched_env import get_jobsched_env
+
+DEFAULT_CONCURRENCY = 32   # autorep processes running at once
+DEFAULT_TIMEOUT = 60       # seconds per autorep call
+DEFAULT_RETRIES = 2        # extra attempts after a failure or timeout
+DEFAULT_BACKOFF = 1.0      # seconds, doubled after every failed attempt
+
+class AutorepPool:
+    """Runs autorep with asyncio.create_subprocess_exec (no shell) and bounded concurrency."""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, env=None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.env = env if env is not None else get_jobsched_env()
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run_once(self, args):
+        process = await asyncio.create_subprocess_exec(
+            'autorep', *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=self.env)
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode:
+            raise RuntimeError(f"autorep {' '.join(args)} exited {process.returncode}: {stderr.decode().strip()}")
+        return stdout.decode()
+
+    async def run(self, args):
+        """Returns autorep stdout, retrying failures and timeouts; raises after the last attempt."""
+        async with self.semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    return await self._run_once(args)
+                except (asyncio.TimeoutError, RuntimeError, OSError) as e:
+                    if attempt == self.retries:
+                        raise RuntimeError(f"autorep {' '.join(args)} failed after {attempt + 1} attempt(s): {e!r}")
+                    await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def rows(self, args):
+        return list(parse_lines((await self.run(args)).splitlines()))
+
+    async def job_history(self, job_name, runs=90):
+        """[(start timestamp, status)] of one job's SU/FA runs, oldest first; parsed once, ready to bisect."""
+        try:
+            rows = await self.rows(['-J', job_name, '-r', str(runs)])
+        except RuntimeError as e:
+            print(f"ERROR: Could not fetch job history for {job_name}: {e}")
+            return []
+
+        history = []
+        for row in rows:
+            started = to_timestamp(row.last_start)
+            if started and row.status in ("SU", "FA"):
+                history.append((started, row.status))
+        history.sort()
+        return history
+
+    async def job_histories(self, job_names, runs=90):
+        """Fetches every job's history concurrently; returns {job_name: history}."""
+        job_names = list(job_names)
+        results = await asyncio.gather(*(self.job_history(job_name, runs) for job_name in job_names))
+        return dict(zip(job_names, results))
+
+def fetch_job_histories(job_names, runs=90, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                        retries=DEFAULT_RETRIES, env=None):
+    """Blocking entry point for scripts that aren't async themselves."""
+    async def _fetch():
+        pool = AutorepPool(concurrency, timeout, retries, env=env)
+        return await pool.job_histories(job_names, runs)
+    return asyncio.run(_fetch())
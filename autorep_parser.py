@@ -0,0 +1,123 @@
+import subprocess
+import re
+import tempfile
+from operator import itemgetter
+from datetime import datetime
+from typing import NamedTuple
+from jobsched_env import get_jobsched_env
+
+# A header underline: only dashes/underscores and spaces, e.g. "-------- ---------- --"
+SEPARATOR = re.compile(r'^[ _-]*[-_]{2}[ _-]*$')
+COLUMN_SPAN = re.compile(r'[-_]+')
+
+# Header text -> AutorepRow field. Anything else in the header is ignored.
+COLUMN_NAMES = {
+    'job name': 'job_name',
+    'last start': 'last_start',
+    'last end': 'last_end',
+    'st': 'status',
+    'st/ex': 'status',
+    'status': 'status',
+    'run/ntry': 'run_ntry',
+    'run': 'run_ntry',
+    'pri/xit': 'pri_xit',
+    'exit': 'pri_xit',
+}
+
+DATE_FORMATS = ('%m/%d/%y %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S')
+
+class AutorepRow(NamedTuple):
+    job_name: str
+    last_start: str
+    last_end: str
+    status: str
+    run_ntry: str
+    pri_xit: str
+
+class ColumnLayout:
+    """Column offsets of one autorep report, worked out once from its '---' underline."""
+
+    __slots__ = ('getter',)
+
+    def __init__(self, header, separator):
+        spans = [m.start() for m in COLUMN_SPAN.finditer(separator)]
+        # Each column runs up to where the next one starts, so a value that overflows its
+        # underline by a character or two still lands in the right field.
+        bounds = list(zip(spans, spans[1:] + [None]))
+
+        by_field = {}
+        for start, end in bounds:
+            name = ' '.join(header[start:end].split()).lower()
+            field = COLUMN_NAMES.get(name)
+            if field and field not in by_field:
+                by_field[field] = slice(start, end)
+
+        if not by_field:
+            # No recognisable header text: fall back to the usual autorep column order
+            by_field = dict(zip(AutorepRow._fields, (slice(s, e) for s, e in bounds)))
+
+        # Missing columns read as '' (slice(0, 0) is always empty). itemgetter does all the
+        # slicing of a line in one C call.
+        self.getter = itemgetter(*(by_field.get(field, slice(0, 0)) for field in AutorepRow._fields))
+
+    def parse(self, line):
+        return tuple.__new__(AutorepRow, map(str.strip, self.getter(line)))
+
+def parse_lines(lines):
+    """Yields an AutorepRow for every job line; accepts any iterable of lines (list, file, pipe)."""
+    layout = None
+    pending = None  # last non-blank line: a job row, or the header if an underline follows
+    for line in lines:
+        if line[:1] in '-_' and SEPARATOR.match(line):
+            # A new report block (autorep repeats the header per pattern) resets the layout
+            layout = ColumnLayout(pending or '', line)
+            pending = None
+            continue
+        if not line.strip():
+            continue
+        if layout is not None and pending is not None:
+            row = layout.parse(pending)
+            if row.job_name:
+                yield row
+        pending = line
+    if layout is not None and pending is not None:
+        row = layout.parse(pending)
+        if row.job_name:
+            yield row
+
+def parse_output(output):
+    """Parses a complete autorep stdout string."""
+    return parse_lines(output.splitlines())
+
+def iter_autorep(args, env=None):
+    """Runs `autorep <args>` and yields rows while the output is still streaming in."""
+    if env is None:
+        env = get_jobsched_env()
+    # stderr goes to a temp file so a chatty autorep can't block on a full pipe while we read stdout
+    with tempfile.TemporaryFile(mode='w+') as stderr:
+        process = subprocess.Popen(['autorep'] + list(args), stdout=subprocess.PIPE, stderr=stderr,
+                                   text=True, env=env)
+        try:
+            yield from parse_lines(process.stdout)
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        if returncode:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(returncode, process.args, stderr=stderr.read())
+
+def to_timestamp(value):
+    """Converts an autorep date column to a UNIX timestamp, None for '-----' or bad input."""
+    if not value or value.startswith('-'):
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return int(datetime.strptime(value, fmt).timestamp())
+        except ValueError:
+            continue
+    return None
+
+def to_int(value):
+    """Reads the leading number of a column like '123456/1', None if there is none."""
+    match = re.match(r'\d+', value or '')
+    return int(match.group(0)) if match else None
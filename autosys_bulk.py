@@ -0,0 +1,75 @@
+import subprocess
+import argparse
+from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+from autorep_parser import iter_autorep, to_timestamp, to_int
+
+# Same status codes all5.py pushes on the 'status' metric_type (-1 for anything else)
+STATUS_CODES = {'SU': 1, 'FA': 0, 'OI': 2, 'OH': 3, 'TE': 4}
+
+# How many patterns/job names go into one comma-joined `autorep -J` call
+BATCH_SIZE = 50
+
+def row_details(row):
+    """Turns an AutorepRow into the (status, start, end, run_ntry, pri_xit) tuple all5.py works with."""
+    return (row.status, to_timestamp(row.last_start), to_timestamp(row.last_end),
+            to_int(row.run_ntry), to_int(row.pri_xit))
+
+def get_autosys_job_snapshot(patterns, batch_size=BATCH_SIZE, raise_errors=False):
+    """Fetches details for every job matching the patterns with one autorep call per batch.
+
+    With raise_errors=True a failed batch raises instead of being skipped, so callers that
+    diff snapshots don't mistake a failed call for jobs that disappeared.
+    """
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    jobs = {}
+    for i in range(0, len(patterns), batch_size):
+        batch = ",".join(patterns[i:i + batch_size])
+        try:
+            for row in iter_autorep(['-J', batch]):
+                jobs[row.job_name] = row_details(row)
+        except subprocess.CalledProcessError as e:
+            if raise_errors:
+                raise
+            print(f"Error running autorep for {batch}: {str(e)}")
+    return jobs
+
+def build_registry(jobs):
+    """Fills the autosys_job_details gauge exactly the way all5.py does, from a snapshot."""
+    registry = CollectorRegistry()
+    job_gauge = Gauge('autosys_job_details', 'Autosys job details', ['job_name', 'metric_type'], registry=registry)
+
+    for job_name, (status, start_timestamp, end_timestamp, run_ntry, pri_xit) in jobs.items():
+        job_gauge.labels(job_name=job_name, metric_type='status').set(STATUS_CODES.get(status, -1))
+        if start_timestamp:
+            job_gauge.labels(job_name=job_name, metric_type='start_timestamp').set(start_timestamp)
+        if end_timestamp:
+            job_gauge.labels(job_name=job_name, metric_type='end_timestamp').set(end_timestamp)
+        if run_ntry is not None:
+            job_gauge.labels(job_name=job_name, metric_type='run_ntry').set(run_ntry)
+        if pri_xit is not None:
+            job_gauge.labels(job_name=job_name, metric_type='pri_xit').set(pri_xit)
+
+    return registry
+
+def main():
+    parser = argparse.ArgumentParser(description="Push Autosys job details using one bulk autorep snapshot")
+    parser.add_argument('--pattern', action='append', required=True, help="Job pattern, repeat for several (e.g. PRD_FIN_%%)")
+    parser.add_argument('--gateway-url', required=True, help="Push Gateway URL")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Patterns per autorep call")
+    args = parser.parse_args()
+
+    jobs = get_autosys_job_snapshot(args.pattern, args.batch_size)
+    if not jobs:
+        print("No jobs found or error occurred.")
+        return
+
+    registry = build_registry(jobs)
+
+    # Push all the metrics to the Pushgateway under the same job as all5.py
+    push_to_gateway(args.gateway_url, job='autosys_jobs_monitor', registry=registry)
+    print(f"Metrics for {len(jobs)} jobs pushed to Pushgateway.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import subprocess
+import argparse
+import time
+import zlib
+from prometheus_client import push_to_gateway, delete_from_gateway
+from autosys_bulk import get_autosys_job_snapshot, build_registry, BATCH_SIZE
+
+# Jobs are spread over a fixed number of Pushgateway groups ("shards").
+# A push replaces one whole group, so only the shards holding a changed job are re-sent,
+# and a fresh start never costs more than SHARDS pushes however many jobs there are.
+SHARDS = 64
+
+def shard_of(job_name, shards=SHARDS):
+    """Stable shard number for a job (crc32, so it survives restarts unlike hash())."""
+    return zlib.crc32(job_name.encode()) % shards
+
+class JobStateCache:
+    """Last-known (status, start, end, run_ntry, pri_xit) per job, kept between polls."""
+
+    def __init__(self, shards=SHARDS):
+        self.shards = shards
+        self.jobs = {}
+
+    def update(self, snapshot):
+        """Stores a new snapshot and returns the set of shards whose jobs changed."""
+        changed = set()
+        for job_name, details in snapshot.items():
+            if self.jobs.get(job_name) != details:
+                changed.add(shard_of(job_name, self.shards))
+        for job_name in self.jobs.keys() - snapshot.keys():
+            changed.add(shard_of(job_name, self.shards))  # job removed or renamed
+        self.jobs = snapshot
+        return changed
+
+    def shard_jobs(self, shard):
+        return {job_name: details for job_name, details in self.jobs.items()
+                if shard_of(job_name, self.shards) == shard}
+
+def push_shards(cache, shards, gateway_url, job):
+    """Re-pushes the given shards; an emptied shard is deleted from the gateway.
+
+    Returns the shards that failed, to be pushed again on the next poll.
+    """
+    failed = set()
+    for shard in sorted(shards):
+        jobs = cache.shard_jobs(shard)
+        grouping_key = {'shard': str(shard)}
+        try:
+            if jobs:
+                push_to_gateway(gateway_url, job=job, registry=build_registry(jobs), grouping_key=grouping_key)
+            else:
+                delete_from_gateway(gateway_url, job=job, grouping_key=grouping_key)
+        except OSError as e:
+            print(f"Error pushing shard {shard}: {e}")
+            failed.add(shard)
+    return failed
+
+def run_daemon(patterns, gateway_url, interval=15, resync=600, batch_size=BATCH_SIZE,
+               shards=SHARDS, job='autosys_jobs_monitor'):
+    """Polls autorep every `interval` seconds and pushes only what changed."""
+    cache = JobStateCache(shards)
+    last_resync = float('-inf')  # the first poll pushes every shard
+    unpushed = set()  # shards whose last push failed; the cache already holds their new state
+
+    while True:
+        started = time.monotonic()
+        try:
+            snapshot = get_autosys_job_snapshot(patterns, batch_size, raise_errors=True)
+        except (subprocess.CalledProcessError, OSError) as e:
+            # Keep the cache as it was; a failed poll must not look like every job vanished
+            print(f"Error polling autorep, keeping last-known state: {e}")
+            snapshot = None
+
+        if snapshot is not None:
+            changed = cache.update(snapshot) | unpushed
+            if started - last_resync >= resync:
+                # Periodic full push so a restarted Pushgateway gets repopulated
+                changed = set(range(shards))
+                last_resync = started
+            if changed:
+                unpushed = push_shards(cache, changed, gateway_url, job)
+                print(f"Pushed {len(changed) - len(unpushed)} of {len(changed)} shard(s) for {len(cache.jobs)} jobs.")
+
+        time.sleep(max(0, interval - (time.monotonic() - started)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident Autosys exporter that pushes only changed jobs")
+    parser.add_argument('--pattern', action='append', required=True, help="Job pattern, repeat for several (e.g. PRD_FIN_%%)")
+    parser.add_argument('--gateway-url', required=True, help="Push Gateway URL")
+    parser.add_argument('--interval', type=float, default=15, help="Seconds between autorep polls")
+    parser.add_argument('--resync', type=float, default=600, help="Seconds between full pushes of every shard")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Patterns per autorep call")
+    parser.add_argument('--shards', type=int, default=SHARDS, help="Pushgateway groups to spread jobs over")
+    args = parser.parse_args()
+
+    try:
+        run_daemon(args.pattern, args.gateway_url, args.interval, args.resync, args.batch_size, args.shards)
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+if __name__ == "__main__":
+    main()
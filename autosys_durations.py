@@ -0,0 +1,192 @@
+import argparse
+import subprocess
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from prometheus_client import start_http_server
+from prometheus_client.core import GaugeMetricFamily, HistogramMetricFamily, REGISTRY
+from autosys_bulk import get_autosys_job_snapshot, BATCH_SIZE
+from autosys_history import HistoryStore
+
+# Fixed bucket bounds (seconds) shared by every job, so histograms merge by adding counts
+BUCKETS = (30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 14400, 28800, 43200, 86400)
+RECENT_RUNS = 50      # runs kept per job for the rolling p50/p95
+MIN_RUNS = 5          # runs needed before a job has a baseline
+SLA_FACTOR = 1.5      # a run is a breach past SLA_FACTOR x its p95 ...
+SLA_MIN_MARGIN = 300  # ... and at least this many seconds past it
+MAX_JOBS = 50000      # least recently updated jobs are dropped past this
+
+class DurationStats:
+    """Bucket counts plus the last RECENT_RUNS durations of one job; under 1 KB per job all in."""
+
+    __slots__ = ('counts', 'total', 'count', 'recent', 'filled', 'last_start')
+
+    def __init__(self, recent_runs=RECENT_RUNS):
+        self.counts = array('L', [0]) * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.recent = array('f', [0.0]) * recent_runs  # ring buffer, oldest overwritten first
+        self.filled = 0
+        self.last_start = -1
+
+    def add(self, duration):
+        self.counts[bisect_left(BUCKETS, duration)] += 1
+        self.total += duration
+        if self.recent:
+            self.recent[self.count % len(self.recent)] = duration
+            self.filled = min(self.filled + 1, len(self.recent))
+        self.count += 1
+
+    def quantile(self, q):
+        if not self.filled:
+            return None
+        ordered = sorted(self.recent[:self.filled])
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def baseline(self):
+        """Duration above which a run counts as an SLA breach, None until MIN_RUNS runs are seen."""
+        if self.filled < MIN_RUNS:
+            return None
+        p95 = self.quantile(0.95)
+        return max(p95 * SLA_FACTOR, p95 + SLA_MIN_MARGIN)
+
+class DurationTracker:
+    """Per-job DurationStats with an LRU bound on how many jobs are held."""
+
+    def __init__(self, max_jobs=MAX_JOBS, recent_runs=RECENT_RUNS):
+        self.max_jobs = max_jobs
+        self.recent_runs = recent_runs
+        self.jobs = OrderedDict()
+        self.breached = {}  # job -> duration of the run currently over its baseline
+        self.breached_running = set()  # jobs in breached only because check_running flagged them
+        self.lock = threading.Lock()
+
+    def observe(self, job_name, run_start, run_end):
+        """Adds one finished run; runs at or before the last one seen for the job are ignored."""
+        with self.lock:
+            stats = self.jobs.get(job_name)
+            if stats is None:
+                stats = self.jobs[job_name] = DurationStats(self.recent_runs)
+                if len(self.jobs) > self.max_jobs:
+                    evicted, _ = self.jobs.popitem(last=False)
+                    self.breached.pop(evicted, None)
+                    self.breached_running.discard(evicted)
+            else:
+                self.jobs.move_to_end(job_name)
+            if run_start <= stats.last_start or run_end < run_start:
+                return
+            stats.last_start = run_start
+            self.breached_running.discard(job_name)  # the finished run is judged below instead
+            duration = run_end - run_start
+            limit = stats.baseline()  # judged against the baseline before this run is added
+            stats.add(duration)
+            if limit is not None and duration > limit:
+                self.breached[job_name] = duration
+            else:
+                self.breached.pop(job_name, None)
+
+    def check_running(self, running, now=None):
+        """Flags jobs still running past their baseline; `running` is {job_name: start_timestamp}.
+
+        Earlier flags are cleared first, so a job that stopped running (FA, TE, ...) without
+        a finished run reaching observe() doesn't stay in breach.
+        """
+        now = now or time.time()
+        with self.lock:
+            for job_name in self.breached_running:
+                self.breached.pop(job_name, None)
+            self.breached_running = set()
+            for job_name, run_start in running.items():
+                stats = self.jobs.get(job_name)
+                limit = stats.baseline() if stats else None
+                if limit is not None and now - run_start > limit:
+                    self.breached[job_name] = now - run_start
+                    self.breached_running.add(job_name)
+
+class DurationCollector:
+    """Exposes per-job duration histograms, rolling p50/p95 and SLA breaches on /metrics."""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        histogram = HistogramMetricFamily('autosys_job_duration_seconds', 'Autosys job run time', labels=['job_name'])
+        quantiles = GaugeMetricFamily('autosys_job_duration_quantile_seconds', 'Rolling run-time quantiles over recent runs',
+                                      labels=['job_name', 'quantile'])
+        breach = GaugeMetricFamily('autosys_job_sla_breach_seconds', 'Run time of a run over its baseline', labels=['job_name'])
+
+        with self.tracker.lock:
+            for job_name, stats in self.tracker.jobs.items():
+                cumulative = 0
+                buckets = []
+                for bound, count in zip(BUCKETS + (float('inf'),), stats.counts):
+                    cumulative += count
+                    buckets.append(('+Inf' if bound == float('inf') else str(bound), cumulative))
+                histogram.add_metric([job_name], buckets, stats.total)
+                for q in (0.5, 0.95):
+                    value = stats.quantile(q)
+                    if value is not None:
+                        quantiles.add_metric([job_name, str(q)], value)
+            for job_name, duration in self.tracker.breached.items():
+                breach.add_metric([job_name], duration)
+
+        yield histogram
+        yield quantiles
+        yield breach
+
+def update(tracker, store, patterns, since):
+    """Feeds runs from the history store into the tracker, then checks what's still running.
+
+    A pattern autorep fails on (a transient error, or no jobs matching) is logged and skipped
+    this round. Returns False if any was, so the caller keeps `since` where it was.
+    """
+    refreshed = []
+    for pattern in patterns:
+        try:
+            store.refresh([pattern])
+            refreshed.append(pattern)
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"WARNING: history refresh failed for {pattern}, serving what is stored: {e}")
+    for job_name, run_start, run_end in store.finished_runs(patterns, since, statuses=('SU',)):
+        tracker.observe(job_name, run_start, run_end)
+    try:
+        # raise_errors: a failed batch must not read as its jobs having stopped running
+        snapshot = get_autosys_job_snapshot(refreshed, BATCH_SIZE, raise_errors=True) if refreshed else {}
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"WARNING: status snapshot failed, keeping running-job breaches as they were: {e}")
+        return False
+    tracker.check_running({job_name: details[1] for job_name, details in snapshot.items()
+                           if details[0] == 'RU' and details[1]})
+    return len(refreshed) == len(patterns)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Autosys run-time histograms and SLA breaches on /metrics")
+    parser.add_argument('--pattern', action='append', required=True, help="Job pattern, repeat for several (e.g. PRD_FIN_%%)")
+    parser.add_argument('--port', type=int, default=9190, help="Port to serve /metrics on")
+    parser.add_argument('--interval', type=float, default=300, help="Seconds between history refreshes")
+    parser.add_argument('--max-jobs', type=int, default=MAX_JOBS, help="Most jobs to keep statistics for")
+    args = parser.parse_args()
+
+    tracker = DurationTracker(args.max_jobs)
+    store = HistoryStore()
+    REGISTRY.register(DurationCollector(tracker))
+    start_http_server(args.port)
+    print(f"Serving Autosys duration metrics on :{args.port}/metrics")
+
+    since = 0  # first pass loads everything the store holds
+    try:
+        while True:
+            started = time.time()
+            if update(tracker, store, args.pattern, since):
+                since = started - args.interval * 2  # overlap; already-seen runs are skipped
+            time.sleep(max(0, args.interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+if __name__ == "__main__":
+    main()
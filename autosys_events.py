@@ -0,0 +1,206 @@
+import os
+import re
+import sqlite3
+import argparse
+import time
+from datetime import datetime
+from typing import NamedTuple
+from prometheus_client import Gauge, Counter, start_http_server
+from autosys_bulk import get_autosys_job_snapshot, STATUS_CODES, BATCH_SIZE
+from job_catalog import matches
+
+# Status names used by the event log / event server -> the two-letter autorep codes
+STATUS_NAMES = {
+    'RUNNING': 'RU', 'STARTING': 'ST', 'SUCCESS': 'SU', 'FAILURE': 'FA', 'TERMINATED': 'TE',
+    'ON_ICE': 'OI', 'INACTIVE': 'IN', 'ACTIVATED': 'AC', 'RESTART': 'RE', 'ON_HOLD': 'OH',
+    'QUE_WAIT': 'QW', 'ON_NOEXEC': 'NE', 'PEND_MACH': 'PE', 'RESWAIT': 'RW',
+}
+# Numeric status column of the event server tables
+STATUS_NUMBERS = {
+    1: 'RU', 3: 'ST', 4: 'SU', 5: 'FA', 6: 'TE', 7: 'OI', 8: 'IN', 9: 'AC', 10: 'RE', 11: 'OH',
+    12: 'QW', 14: 'PE', 15: 'RW', 16: 'NE',
+}
+CHANGE_STATUS = 101  # event code of a status change in the event server tables
+
+# event_demon log line, e.g.
+# [10/17/2026 01:00:00]      CAUAJM_I_40245 EVENT: CHANGE_STATUS    STATUS: SUCCESS    JOB: PRD_FIN_LOAD
+EVENT_LINE = re.compile(r'^\[(?P<time>[^\]]+)\]\s+\S+\s+EVENT:\s+CHANGE_STATUS\s+STATUS:\s+(?P<status>\S+)\s+JOB:\s+(?P<job>\S+)')
+EVENT_TIME_FORMATS = ('%m/%d/%Y %H:%M:%S', '%m/%d/%y %H:%M:%S')
+
+class JobEvent(NamedTuple):
+    timestamp: float
+    job_name: str
+    status: str
+
+def to_status_code(status):
+    if isinstance(status, int) or (isinstance(status, str) and status.isdigit()):
+        return STATUS_NUMBERS.get(int(status), 'UNKNOWN')
+    return STATUS_NAMES.get(status.upper(), status.upper()[:2])
+
+def parse_event_line(line):
+    match = EVENT_LINE.match(line)
+    if match is None:
+        return None
+    for fmt in EVENT_TIME_FORMATS:
+        try:
+            timestamp = datetime.strptime(match.group('time'), fmt).timestamp()
+            break
+        except ValueError:
+            continue
+    else:
+        timestamp = time.time()
+    return JobEvent(timestamp, match.group('job'), to_status_code(match.group('status')))
+
+class EventLogSource:
+    """Tails an event_demon log, following rotation and truncation by inode and size."""
+
+    def __init__(self, path, from_start=False):
+        self.path = path
+        self.file = None
+        self.inode = None
+        self.partial = ''
+        self._open(seek_end=not from_start)
+
+    def _open(self, seek_end=False):
+        if self.file:
+            self.file.close()
+        try:
+            self.file = open(self.path, 'r', errors='ignore')
+        except FileNotFoundError:
+            self.file, self.inode = None, None
+            return
+        self.inode = os.fstat(self.file.fileno()).st_ino
+        self.partial = ''
+        if seek_end:
+            self.file.seek(0, os.SEEK_END)
+
+    def poll(self):
+        """Events appended since the last poll."""
+        events = []
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+
+        if self.file is not None:
+            # Drain what's left of the current file first, even if it has just been rotated away
+            events.extend(self._read())
+            if stat is not None and (stat.st_ino != self.inode or stat.st_size < self.file.tell()):
+                self._open()
+                events.extend(self._read())
+        elif stat is not None:
+            self._open()
+            events.extend(self._read())
+        return events
+
+    def _read(self):
+        data = self.partial + self.file.read()
+        lines = data.split('\n')
+        self.partial = lines.pop()  # incomplete last line waits for the next poll
+        return [event for event in map(parse_event_line, lines) if event]
+
+class EventTableSource:
+    """Reads CHANGE_STATUS rows newer than the last seen eoid from an event server table.
+
+    `conn` is any DB-API connection using '?' placeholders - an SQLite file stands in for
+    the event server in tests; columns are eoid, job_name, event, status, event_time_gmt.
+    """
+
+    def __init__(self, conn, table='ujo_proc_event', from_start=False):
+        self.conn = conn
+        self.table = table
+        self.last_eoid = None
+        if not from_start:
+            row = conn.execute(f"SELECT MAX(eoid) FROM {table}").fetchone()
+            self.last_eoid = row[0] if row else None
+
+    def poll(self):
+        query = f"SELECT eoid, job_name, status, event_time_gmt FROM {self.table} WHERE event = ?"
+        params = [CHANGE_STATUS]
+        if self.last_eoid is not None:
+            query += " AND eoid > ?"
+            params.append(self.last_eoid)
+        events = []
+        for eoid, job_name, status, event_time in self.conn.execute(query + " ORDER BY eoid", params):
+            self.last_eoid = eoid
+            events.append(JobEvent(float(event_time), job_name, to_status_code(status)))
+        return events
+
+class JobStateFeed:
+    """Current status per job; apply() reports only real transitions."""
+
+    def __init__(self, statuses=None):
+        self.statuses = dict(statuses or {})
+
+    def apply(self, events, job_filter=None):
+        transitions = []
+        for event in events:
+            if job_filter and not job_filter(event.job_name):
+                continue
+            previous = self.statuses.get(event.job_name)
+            if previous != event.status:
+                self.statuses[event.job_name] = event.status
+                transitions.append((event, previous))
+        return transitions
+
+job_gauge = Gauge('autosys_job_details', 'Autosys job details', ['job_name', 'metric_type'])
+transition_counter = Counter('autosys_job_transitions', 'Job status transitions seen on the event feed', ['status'])
+
+def publish(job_name, status, start_timestamp=None, end_timestamp=None):
+    job_gauge.labels(job_name=job_name, metric_type='status').set(STATUS_CODES.get(status, -1))
+    if start_timestamp:
+        job_gauge.labels(job_name=job_name, metric_type='start_timestamp').set(start_timestamp)
+    if end_timestamp:
+        job_gauge.labels(job_name=job_name, metric_type='end_timestamp').set(end_timestamp)
+
+def run_feed(source, feed, job_filter=None, interval=1.0):
+    """Polls the source and only touches the gauges of jobs whose status changed."""
+    while True:
+        for event, _ in feed.apply(source.poll(), job_filter):
+            transition_counter.labels(status=event.status).inc()
+            if event.status in ('RU', 'ST'):
+                publish(event.job_name, event.status, start_timestamp=event.timestamp)
+            elif event.status in ('SU', 'FA', 'TE'):
+                publish(event.job_name, event.status, end_timestamp=event.timestamp)
+            else:
+                publish(event.job_name, event.status)
+        time.sleep(interval)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Autosys job status from the event log / event server")
+    parser.add_argument('--pattern', action='append', required=True, help="Job pattern, repeat for several (e.g. PRD_FIN_%%)")
+    parser.add_argument('--event-log', help="event_demon log to tail")
+    parser.add_argument('--event-db', help="SQLite copy of the event server table (testing / replicas)")
+    parser.add_argument('--port', type=int, default=9189, help="Port to serve /metrics on")
+    parser.add_argument('--interval', type=float, default=1.0, help="Seconds between event polls")
+    args = parser.parse_args()
+
+    if bool(args.event_log) == bool(args.event_db):
+        parser.error("give exactly one of --event-log / --event-db")
+
+    # The source marks its position (log end / MAX(eoid)) before the seed, so events that
+    # arrive while the snapshot runs are replayed on top of it instead of lost
+    if args.event_log:
+        source = EventLogSource(args.event_log)
+    else:
+        source = EventTableSource(sqlite3.connect(args.event_db))
+
+    # One bulk autorep seeds the state; after that only events move it
+    snapshot = get_autosys_job_snapshot(args.pattern, BATCH_SIZE)
+    for job_name, (status, start_timestamp, end_timestamp, _, _) in snapshot.items():
+        publish(job_name, status, start_timestamp, end_timestamp)
+    feed = JobStateFeed({job_name: details[0] for job_name, details in snapshot.items()})
+
+    # Events for jobs outside the patterns are ignored
+    def job_filter(job_name):
+        return any(matches(job_name, pattern) for pattern in args.pattern)
+
+    start_http_server(args.port)
+    print(f"Seeded {len(snapshot)} jobs; serving event-driven metrics on :{args.port}/metrics")
+    try:
+        run_feed(source, feed, job_filter, args.interval)
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import subprocess
+import argparse
+import threading
+import time
+from prometheus_client import start_http_server
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from autosys_bulk import get_autosys_job_snapshot, STATUS_CODES, BATCH_SIZE
+
+class AutosysCollector:
+    """Serves Autosys job state on /metrics, running autorep only when scraped.
+
+    The snapshot is cached for `ttl` seconds and refreshed under a lock, so the two
+    Prometheus servers of an HA pair scraping at the same moment share one autorep run.
+    """
+
+    def __init__(self, patterns, ttl=10, batch_size=BATCH_SIZE):
+        self.patterns = patterns
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.fetched_at = None
+        self.duration = 0.0
+        self.success = 0
+
+    def snapshot(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.fetched_at is None or now - self.fetched_at >= self.ttl:
+                try:
+                    self.jobs = get_autosys_job_snapshot(self.patterns, self.batch_size, raise_errors=True)
+                    self.success = 1
+                except (subprocess.CalledProcessError, OSError) as e:
+                    # Serve nothing rather than stale rows; autosys_up tells Prometheus why
+                    print(f"Error running autorep: {e}")
+                    self.jobs = {}
+                    self.success = 0
+                self.duration = time.monotonic() - now
+                self.fetched_at = time.monotonic()
+            return self.jobs, self.duration, self.success
+
+    def describe(self):
+        # Without this, registering the collector would run autorep once at start-up
+        return []
+
+    def collect(self):
+        jobs, duration, success = self.snapshot()
+
+        details = GaugeMetricFamily('autosys_job_details', 'Autosys job details', labels=['job_name', 'metric_type'])
+        days_on_status = GaugeMetricFamily('autosys_job_days_on_status', 'Days an on ice / on hold job has been in that status',
+                                           labels=['job_name', 'status'])
+        now = time.time()
+
+        for job_name, (status, start_timestamp, end_timestamp, run_ntry, pri_xit) in jobs.items():
+            details.add_metric([job_name, 'status'], STATUS_CODES.get(status, -1))
+            if start_timestamp:
+                details.add_metric([job_name, 'start_timestamp'], start_timestamp)
+            if end_timestamp:
+                details.add_metric([job_name, 'end_timestamp'], end_timestamp)
+            if run_ntry is not None:
+                details.add_metric([job_name, 'run_ntry'], run_ntry)
+            if pri_xit is not None:
+                details.add_metric([job_name, 'pri_xit'], pri_xit)
+            if status in ('OI', 'OH') and start_timestamp:
+                days_on_status.add_metric([job_name, status], int((now - start_timestamp) // 86400))
+
+        yield details
+        yield days_on_status
+        yield GaugeMetricFamily('autosys_up', 'Whether the last autorep call succeeded', value=success)
+        yield GaugeMetricFamily('autosys_autorep_duration_seconds', 'Time taken by the last autorep call', value=duration)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Autosys job status on /metrics")
+    parser.add_argument('--pattern', action='append', required=True, help="Job pattern, repeat for several (e.g. PRD_FIN_%%)")
+    parser.add_argument('--port', type=int, default=9188, help="Port to serve /metrics on")
+    parser.add_argument('--ttl', type=float, default=10, help="Seconds an autorep snapshot is reused across scrapes")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Patterns per autorep call")
+    args = parser.parse_args()
+
+    REGISTRY.register(AutosysCollector(args.pattern, args.ttl, args.batch_size))
+    start_http_server(args.port)
+    print(f"Serving Autosys metrics on :{args.port}/metrics")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import re
+import argparse
+import hashlib
+import statistics
+import subprocess
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import NamedTuple
+from jobsched_env import get_jobsched_env
+from autosys_history import HistoryStore
+
+# JIL as printed by `autorep -J <pattern> -q`: one block per job, starting at insert_job
+INSERT_JOB = re.compile(r'^\s*insert_job:\s*(\S+)', re.MULTILINE)
+ATTRIBUTE = re.compile(r'(\w+):\s*(.*?)(?=\s+\w+:\s|$)')
+# s(JOB), success(JOB), d(JOB), f(JOB), t(JOB), n(JOB), e(JOB) > 0 ... ; JOB^INS is another instance
+# JIL accepts the short job types too (job_type: b); everything here compares the long form
+JOB_TYPES = {'B': 'BOX', 'C': 'CMD', 'F': 'FW'}
+CONDITION_JOB = re.compile(r'\b(?:s|success|f|failure|d|done|t|terminated|n|notrunning|e|exitcode)\s*\(\s*([^,)\s]+)', re.IGNORECASE)
+
+class JobDef(NamedTuple):
+    name: str
+    job_type: str
+    box_name: str
+    conditions: tuple  # names of the jobs this one's condition: refers to
+
+def condition_jobs(condition):
+    """Job names referenced by a condition: clause; cross-instance ones (JOB^INS) are skipped."""
+    return tuple(dict.fromkeys(name for name in CONDITION_JOB.findall(condition or '') if '^' not in name))
+
+def split_jil(jil):
+    """{job_name: JIL block} for every insert_job in the text."""
+    starts = [(m.start(), m.group(1)) for m in INSERT_JOB.finditer(jil)]
+    return {name: jil[start:end].strip()
+            for (start, name), (end, _) in zip(starts, starts[1:] + [(len(jil), None)])}
+
+def parse_block(name, block):
+    attributes = {}
+    for line in block.splitlines():
+        line = line.strip()
+        if not line or line.startswith('/*'):
+            continue
+        if line.startswith('insert_job'):
+            # insert_job and job_type share a line
+            attributes.update((key, value.strip()) for key, value in ATTRIBUTE.findall(line))
+        else:
+            key, _, value = line.partition(':')
+            attributes[key.strip()] = value.strip()
+    job_type = attributes.get('job_type', 'CMD').upper()
+    return JobDef(name, JOB_TYPES.get(job_type, job_type), attributes.get('box_name', ''),
+                  condition_jobs(attributes.get('condition')))
+
+class JobGraph:
+    """Box membership and condition dependencies of every job, updated incrementally from JIL.
+
+    load() only re-parses job blocks whose text changed since the last load and patches
+    their edges in place, so a refresh after a small JIL change costs little more than
+    hashing the text.
+    """
+
+    def __init__(self):
+        self.defs = {}
+        self.hashes = {}
+        self.children = defaultdict(set)    # box -> jobs directly inside it
+        self.dependents = defaultdict(set)  # job -> jobs whose condition refers to it
+
+    def _unlink(self, job):
+        old = self.defs.pop(job, None)
+        if old is None:
+            return
+        if old.box_name:
+            self.children[old.box_name].discard(job)
+        for upstream in old.conditions:
+            self.dependents[upstream].discard(job)
+
+    def _link(self, job_def):
+        self.defs[job_def.name] = job_def
+        if job_def.box_name:
+            self.children[job_def.box_name].add(job_def.name)
+        for upstream in job_def.conditions:
+            self.dependents[upstream].add(job_def.name)
+
+    def load(self, jil, complete=True):
+        """Applies a JIL dump; with complete=True jobs missing from it are dropped. Returns changed names."""
+        blocks = split_jil(jil)
+        changed = set()
+        for name, block in blocks.items():
+            digest = hashlib.sha1(block.encode()).digest()
+            if self.hashes.get(name) == digest:
+                continue
+            self.hashes[name] = digest
+            self._unlink(name)
+            self._link(parse_block(name, block))
+            changed.add(name)
+        if complete:
+            for name in set(self.defs) - blocks.keys():
+                self._unlink(name)
+                self.hashes.pop(name, None)
+                changed.add(name)
+        return changed
+
+    def refresh(self, pattern='ALL'):
+        """Reloads definitions from `autorep -J <pattern> -q`."""
+        result = subprocess.run(['autorep', '-J', pattern, '-q'], capture_output=True, text=True, check=True,
+                                env=get_jobsched_env())
+        return self.load(result.stdout, complete=(pattern == 'ALL'))
+
+    def box_members(self, box):
+        """Every job inside a box, nested boxes included."""
+        members = []
+        queue = deque([box])
+        while queue:
+            for child in self.children.get(queue.popleft(), ()):
+                members.append(child)
+                queue.append(child)
+        return members
+
+    def downstream(self, job):
+        """Jobs held up if `job` fails: those conditioned on it (transitively) and the boxes around them."""
+        seen = set()
+        queue = deque([job])
+        while queue:
+            current = queue.popleft()
+            next_jobs = set(self.dependents.get(current, ()))
+            box = self.defs[current].box_name if current in self.defs else ''
+            if box:
+                next_jobs.add(box)  # the enclosing box can't complete either
+            for name in next_jobs - seen:
+                seen.add(name)
+                queue.append(name)
+        return seen
+
+    def critical_path(self, box, durations, default_duration=0):
+        """(total seconds, [jobs on the longest path]) through a box, in O(jobs + dependencies).
+
+        Each job becomes a start and an end node. A box's start feeds its children's starts
+        and their ends feed the box's end; a condition links the upstream end to the
+        downstream start. Conditions on jobs outside the box are taken as already met.
+        """
+        jobs = set(self.box_members(box)) | {box}
+        edges = defaultdict(list)
+        indegree = defaultdict(int)
+
+        def add_edge(a, b, weight):
+            edges[a].append((b, weight))
+            indegree[b] += 1
+
+        for job in jobs:
+            job_def = self.defs.get(job)
+            is_box = job_def is not None and job_def.job_type == 'BOX'
+            if not is_box:
+                add_edge(('start', job), ('end', job), durations.get(job, default_duration))
+            elif not self.children.get(job):
+                add_edge(('start', job), ('end', job), 0)
+            for child in self.children.get(job, ()) if is_box else ():
+                add_edge(('start', job), ('start', child), 0)
+                add_edge(('end', child), ('end', job), 0)
+            for upstream in job_def.conditions if job_def else ():
+                if upstream in jobs and upstream != box:
+                    add_edge(('end', upstream), ('start', job), 0)
+
+        # Kahn's topological order, relaxing longest distances as nodes come off the queue
+        nodes = {node for job in jobs for node in (('start', job), ('end', job))}
+        distance = {node: 0 for node in nodes}
+        previous = {}
+        queue = deque(node for node in nodes if indegree[node] == 0)
+        visited = 0
+        while queue:
+            node = queue.popleft()
+            visited += 1
+            for target, weight in edges[node]:
+                if target not in previous or distance[node] + weight > distance[target]:
+                    distance[target] = distance[node] + weight
+                    previous[target] = node
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    queue.append(target)
+        if visited != len(nodes):
+            raise ValueError(f"Dependency cycle inside box {box}")
+
+        path = []
+        node = ('end', box)
+        while node in previous:
+            if node[0] == 'end' and node[1] != box:
+                path.append(node[1])
+            node = previous[node]
+        return distance[('end', box)], path[::-1]
+
+    def expected_end(self, box, start_time, durations, default_duration=0):
+        total, _ = self.critical_path(box, durations, default_duration)
+        return start_time + total
+
+def median_durations(store, patterns, days=30):
+    """Median run time per job from the local history store."""
+    runs = defaultdict(list)
+    for job, run_start, run_end in store.finished_runs(patterns, time.time() - days * 86400, statuses=('SU',)):
+        runs[job].append(run_end - run_start)
+    return {job: statistics.median(values) for job, values in runs.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Critical path and failure impact for an Autosys box")
+    parser.add_argument('--box', required=True, help="Box job to analyse")
+    parser.add_argument('--failed', help="Job to show the downstream impact of")
+    args = parser.parse_args()
+
+    graph = JobGraph()
+    graph.refresh()
+    durations = median_durations(HistoryStore(), ['*'])
+
+    total, path = graph.critical_path(args.box, durations)
+    print(f"Critical path of {args.box} ({total / 60:.1f} min): {' -> '.join(path)}")
+    print(f"Expected end if started now: {datetime.fromtimestamp(graph.expected_end(args.box, time.time(), durations))}")
+    if args.failed:
+        print(f"Held up by a failure of {args.failed}: {', '.join(sorted(graph.downstream(args.failed))) or 'nothing'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import math
+import sqlite3
+import time
+from contextlib import closing
+from autorep_parser import iter_autorep, to_timestamp
+
+HISTORY_DB = "autosys_history.db"
+MAX_DAYS = 90  # longest window any endpoint asks for; also how far back a first refresh goes
+
+TIME_RANGES = {
+    "past_3_months": 90,
+    "past_2_months": 60,
+    "past_1_month": 30,
+    "last_week": 7,
+    "last_5_days": 5
+}
+
+FAILURE_STATUSES = ("FA", "FAILURE")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    job       TEXT    NOT NULL,
+    run_start INTEGER NOT NULL,
+    run_end   INTEGER,
+    status    TEXT    NOT NULL,
+    PRIMARY KEY (job, run_start)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_by_start ON runs (run_start);
+CREATE TABLE IF NOT EXISTS refreshes (
+    pattern      TEXT PRIMARY KEY,
+    refreshed_at INTEGER NOT NULL
+);
+"""
+
+def pattern_globs(job_patterns):
+    """SQLite GLOBs for Autosys patterns, read the way JobCatalog.match reads them.
+
+    Comma-joined lists are split, ALL matches every job and % becomes *; '[' is escaped
+    since it opens a character class in a GLOB.
+    """
+    globs = []
+    for pattern in job_patterns:
+        for part in pattern.split(','):
+            part = part.strip()
+            if part == 'ALL':
+                globs.append('*')
+            elif part:
+                globs.append(part.replace('[', '[[]').replace('%', '*'))
+    return globs
+
+def job_condition(job_patterns):
+    """(SQL condition, params) for rows whose job matches any of the patterns."""
+    globs = pattern_globs(job_patterns)
+    return " OR ".join("job GLOB ?" for _ in globs) or "1", globs
+
+class HistoryStore:
+    """Local SQLite copy of autorep run history, keyed on (job, run_start).
+
+    refresh() only asks autorep for the days since a pattern was last refreshed, and
+    window_stats() answers every TIME_RANGES window from one indexed query.
+    """
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the refresh writer
+        return conn
+
+    def lookback_days(self, pattern, max_days=MAX_DAYS, now=None):
+        """How many days of history autorep needs to return to bring `pattern` up to date."""
+        now = int(now or time.time())
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT refreshed_at FROM refreshes WHERE pattern = ?", (pattern,)).fetchone()
+        return max_days if row is None else min(max_days, math.ceil((now - row[0]) / 86400) + 1)
+
+    def append_runs(self, pattern, rows, now=None):
+        """Stores autorep rows for `pattern` that are at or past each job's high-water mark."""
+        now = int(now or time.time())
+        with closing(self._connect()) as conn:
+            where, globs = job_condition([pattern])
+            high_water = dict(conn.execute(
+                f"SELECT job, MAX(run_start) FROM runs WHERE {where} GROUP BY job", globs))
+
+            new_runs = []
+            for run in rows:
+                run_start = to_timestamp(run.last_start)
+                # The latest stored run is re-read so a run that was RU last time gets its final status
+                if run_start is None or run_start < high_water.get(run.job_name, 0):
+                    continue
+                new_runs.append((run.job_name, run_start, to_timestamp(run.last_end), run.status))
+
+            with conn:
+                conn.executemany(
+                    "INSERT INTO runs (job, run_start, run_end, status) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (job, run_start) DO UPDATE SET run_end = excluded.run_end, status = excluded.status",
+                    new_runs)
+                conn.execute("INSERT OR REPLACE INTO refreshes (pattern, refreshed_at) VALUES (?, ?)", (pattern, now))
+        return len(new_runs)
+
+    def refresh(self, job_patterns, max_days=MAX_DAYS, now=None):
+        """Appends runs newer than each job's stored high-water mark; returns how many rows changed.
+
+        Runs past MAX_DAYS are pruned afterwards, so the file only ever holds the longest window.
+        """
+        now = int(now or time.time())
+        changed = 0
+        for pattern in job_patterns:
+            days = self.lookback_days(pattern, max_days, now)
+            changed += self.append_runs(pattern, iter_autorep(['-J', pattern, '-r', str(days)]), now)
+        self.prune(now=now)
+        return changed
+
+    def window_stats(self, job_patterns, time_ranges=TIME_RANGES, now=None):
+        """Failures and other statuses per job for every window, in process_job_stats' shape."""
+        now = int(now or time.time())
+        periods = list(time_ranges)
+        cutoffs = [now - time_ranges[period] * 86400 for period in periods]
+
+        # One pass over the index: each window is a SUM over the rows inside the widest one
+        sums = ", ".join("SUM(run_start >= ?)" for _ in periods)
+        where, globs = job_condition(job_patterns)
+        query = (f"SELECT job, status, {sums} FROM runs "
+                 f"WHERE run_start >= ? AND ({where}) GROUP BY job, status")
+        params = cutoffs + [min(cutoffs)] + globs
+
+        job_stats = {}
+        with closing(self._connect()) as conn:
+            for job, status, *counts in conn.execute(query, params):
+                stats = job_stats.setdefault(job, {p: {"failures": 0, "other_statuses": {}} for p in periods})
+                for period, count in zip(periods, counts):
+                    if not count:
+                        continue
+                    if status in FAILURE_STATUSES:
+                        stats[period]["failures"] += count
+                    else:
+                        stats[period]["other_statuses"][status] = count
+        return job_stats
+
+    def finished_runs(self, job_patterns, since=0, statuses=None):
+        """(job, run_start, run_end) of runs that ended at or after `since`, oldest start first."""
+        where, globs = job_condition(job_patterns)
+        query = f"SELECT job, run_start, run_end FROM runs WHERE run_end >= ? AND ({where})"
+        params = [int(since)] + globs
+        if statuses:
+            query += f" AND status IN ({', '.join('?' for _ in statuses)})"
+            params += list(statuses)
+        with closing(self._connect()) as conn:
+            return conn.execute(query + " ORDER BY run_start", params).fetchall()
+
+    def prune(self, max_days=MAX_DAYS, now=None):
+        """Drops runs older than the longest window so the file doesn't grow forever."""
+        cutoff = int(now or time.time()) - max_days * 86400
+        with closing(self._connect()) as conn, conn:
+            return conn.execute("DELETE FROM runs WHERE run_start < ?", (cutoff,)).rowcount
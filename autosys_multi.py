@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+from autorep_async import AutorepPool
+from autosys_bulk import row_details, STATUS_CODES
+from jobsched_env import get_jobsched_env
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Autosys instances to collect; AUTOSERV picks the instance once the module is loaded.
+# Override with --config pointing at a JSON file of the same shape.
+INSTANCES = {
+    "prod": {"module": "jobsched/QNA", "autoserv": "PRD", "patterns": ["prod_%"]},
+    "qa": {"module": "jobsched/QNA", "autoserv": "QA", "patterns": ["qa_%"]},
+    "uat": {"module": "jobsched/QNA", "autoserv": "UAT", "patterns": ["uat_%"]},
+}
+INSTANCE_TIMEOUT = 30  # seconds; an instance slower than this is reported down, the rest still push
+
+async def instance_env(config):
+    """The instance's module environment (captured once per module, up to 120s) with its AUTOSERV."""
+    env = dict(await asyncio.to_thread(get_jobsched_env, config.get("module", "jobsched/QNA")))
+    if config.get("autoserv"):
+        env["AUTOSERV"] = config["autoserv"]
+    return env
+
+async def collect_instance(name, config, env, timeout):
+    """{job_name: details} for one instance; raises on failure or timeout."""
+    pool = AutorepPool(concurrency=1, timeout=timeout, retries=0, env=env)
+    rows = await pool.rows(['-J', ','.join(config["patterns"])])
+    return {row.job_name: row_details(row) for row in rows}
+
+async def collect_all(instances, timeout=INSTANCE_TIMEOUT):
+    """Queries every instance at once; returns {instance: (jobs or None, seconds taken)}."""
+    async def timed(name, config):
+        started = time.monotonic()
+        try:
+            # The module load isn't part of the instance's time budget, only autorep is
+            env = await instance_env(config)
+            jobs = await asyncio.wait_for(collect_instance(name, config, env, timeout), timeout)
+        except (asyncio.TimeoutError, RuntimeError, OSError) as e:
+            logger.error(f"Instance {name} failed, reporting it down: {e!r}")
+            jobs = None
+        return name, (jobs, time.monotonic() - started)
+
+    results = await asyncio.gather(*(timed(name, config) for name, config in instances.items()))
+    return dict(results)
+
+def build_registry(results):
+    """One registry for all instances, every series labelled with its instance."""
+    registry = CollectorRegistry()
+    job_gauge = Gauge('autosys_job_details', 'Autosys job details', ['instance', 'job_name', 'metric_type'], registry=registry)
+    up_gauge = Gauge('autosys_instance_up', 'Whether the instance answered in time', ['instance'], registry=registry)
+    duration_gauge = Gauge('autosys_instance_collect_seconds', 'Time taken to collect the instance', ['instance'], registry=registry)
+
+    for instance, (jobs, duration) in results.items():
+        up_gauge.labels(instance=instance).set(0 if jobs is None else 1)
+        duration_gauge.labels(instance=instance).set(duration)
+        for job_name, (status, start_timestamp, end_timestamp, run_ntry, pri_xit) in (jobs or {}).items():
+            job_gauge.labels(instance=instance, job_name=job_name, metric_type='status').set(STATUS_CODES.get(status, -1))
+            if start_timestamp:
+                job_gauge.labels(instance=instance, job_name=job_name, metric_type='start_timestamp').set(start_timestamp)
+            if end_timestamp:
+                job_gauge.labels(instance=instance, job_name=job_name, metric_type='end_timestamp').set(end_timestamp)
+            if run_ntry is not None:
+                job_gauge.labels(instance=instance, job_name=job_name, metric_type='run_ntry').set(run_ntry)
+            if pri_xit is not None:
+                job_gauge.labels(instance=instance, job_name=job_name, metric_type='pri_xit').set(pri_xit)
+
+    return registry
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect several Autosys instances concurrently into one push")
+    parser.add_argument("--pushgateway_url", required=True, help="Push Gateway URL")
+    parser.add_argument("--job_name", default="autosys_multi_instance", help="Prometheus job name to push under")
+    parser.add_argument("--config", help="JSON file of instances, same shape as INSTANCES")
+    parser.add_argument("--instance", action="append", help="Only collect these instances (repeatable)")
+    parser.add_argument("--timeout", type=float, default=INSTANCE_TIMEOUT, help="Per-instance timeout in seconds")
+    args = parser.parse_args()
+
+    instances = INSTANCES
+    if args.config:
+        with open(args.config) as f:
+            instances = json.load(f)
+    if args.instance:
+        instances = {name: config for name, config in instances.items() if name in args.instance}
+
+    results = asyncio.run(collect_all(instances, args.timeout))
+    registry = build_registry(results)
+
+    try:
+        push_to_gateway(args.pushgateway_url, job=args.job_name, registry=registry)
+        up = [name for name, (jobs, _) in results.items() if jobs is not None]
+        logger.info(f"Pushed {len(up)}/{len(results)} instance(s): {', '.join(up) or 'none'}")
+    except Exception as e:
+        logger.error(f"Error pushing data to Push Gateway: {e}")
+
+if __name__ == "__main__":
+    main()
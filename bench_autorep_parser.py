@@ -0,0 +1,82 @@
+import io
+import re
+import time
+import argparse
+from autorep_parser import parse_lines
+
+# Micro-benchmark: the shared fixed-width parser against the parsers it replaces,
+# on a synthetic autorep dump (100k job rows by default).
+
+HEADER = ("Job Name                                                         Last Start           Last End             ST Run/Ntry Pri/Xit\n"
+          "---------------------------------------------------------------- -------------------- -------------------- -- -------- -------\n")
+STATUSES = ['SU', 'FA', 'RU', 'OI', 'OH', 'TE']
+
+def make_dump(rows):
+    lines = [HEADER]
+    for i in range(rows):
+        if i % 50 == 0:
+            start, end = '-----', '-----'  # never ran
+        else:
+            start = f"2024-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00"
+            end = f"2024-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:30"
+        lines.append(f"{'PRD_FIN_JOB_%06d' % i:<64} {start:<20} {end:<20} {STATUSES[i % 6]} {f'{i}/1':<8} 0\n")
+    return ''.join(lines)
+
+# up8.py / jf7.py: one regex per line after the '---' header
+UP8_ROW = re.compile(r"(\S+)\s+(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}|\-+)\s+(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}|\-+)\s+(\S+)")
+
+def regex_per_line(output):
+    jobs = {}
+    found_header = False
+    for line in output.split("\n"):
+        if "---" in line:
+            found_header = True
+            continue
+        if not found_header:
+            continue
+        match = UP8_ROW.match(line)
+        if match:
+            jobs[match.group(1)] = match.groups()
+    return jobs
+
+# all5.py: MULTILINE regex over the whole stdout
+ALL5_ROW = re.compile(r'^\s*(\S+)\s+(\S+\s+\S+)\s+(\S+\s+\S+)\s+(\S+)\s+(\S+)\s+(\S+)', re.MULTILINE)
+
+def multiline_regex(output):
+    return {m.group(1): m.groups() for m in ALL5_ROW.finditer(output)}
+
+# jf66.py / jp9.py: whitespace split
+def split_per_line(output):
+    jobs = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) >= 5:
+            jobs[parts[0]] = parts
+    return jobs
+
+def fixed_width(output):
+    return {row.job_name: row for row in parse_lines(io.StringIO(output))}
+
+def bench(name, func, output, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        jobs = func(output)
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<28} {best * 1000:9.1f} ms   {len(jobs)} jobs")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark autorep output parsers")
+    parser.add_argument('--rows', type=int, default=100000, help="Job rows in the synthetic dump")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per parser, best time is reported")
+    args = parser.parse_args()
+
+    output = make_dump(args.rows)
+    print(f"Synthetic autorep dump: {args.rows} rows, {len(output) / 1e6:.1f} MB")
+    bench("regex per line (up8.py)", regex_per_line, output, args.repeat)
+    bench("multiline regex (all5.py)", multiline_regex, output, args.repeat)
+    bench("split (jf66.py)", split_per_line, output, args.repeat)
+    bench("fixed width (autorep_parser)", fixed_width, output, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import resource
+import tempfile
+import contextlib
+import subprocess
+
+# End-to-end benchmark of the Autosys export paths against fake_autorep.py.
+# Every scenario runs in a fresh interpreter (clean caches, its own peak RSS) with a
+# wrapper named `autorep` first on PATH; the fake logs each call so subprocesses can be counted.
+#
+#   python bench_autosys.py --jobs 2000 --runs 30 --latency 0.05
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+FAKE_AUTOREP = os.path.join(REPO, 'fake_autorep.py')
+SCENARIOS = ['all5', 'bulk', 'jp9', 'up8_jobs', 'up8_stats', 'up9_jobs', 'up9_stats']
+
+def scenario_all5(pattern):
+    """all5.py: one autorep to list the jobs, then one more per job.
+
+    all5's regex also matches the header line and strptime then raises, so each job is
+    wrapped here; the subprocess-per-job cost being measured is the same either way.
+    """
+    import all5
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):  # it prints every autorep output
+        for job_name in all5.get_jobs_by_pattern(pattern):
+            try:
+                all5.get_autosys_job_details(job_name)
+            except ValueError:
+                pass
+
+def scenario_bulk(pattern):
+    """autosys_bulk.py: batched -J lists, one registry."""
+    import autosys_bulk
+    autosys_bulk.build_registry(autosys_bulk.get_autosys_job_snapshot([pattern]))
+
+def scenario_jp9(pattern):
+    """jp9.py: catalog lookup, then every job's 90-run history concurrently."""
+    import jp9
+    jp9.analyze_job_failures([pattern])
+
+def scenario_up8_jobs(pattern):
+    import up8
+    up8.get_jobs(up8.JobPatternsRequest(job_patterns=[pattern]))
+
+def scenario_up8_stats(pattern):
+    """Cold history store, so this includes the first 90-day load."""
+    import up8
+    up8.get_job_statistics(up8.JobPatternsRequest(job_patterns=[pattern]))
+
+async def call_endpoint(app, endpoint, request):
+    """Runs the app's startup, awaits an async endpoint and serializes its result."""
+    async with app.router.lifespan_context(app):
+        return json.dumps(await endpoint(request))
+
+def scenario_up9_jobs(pattern):
+    import up9
+    asyncio.run(call_endpoint(up9.app, up9.get_jobs, up9.JobPatternsRequest(job_patterns=[pattern])))
+
+def scenario_up9_stats(pattern):
+    import up9
+    asyncio.run(call_endpoint(up9.app, up9.get_job_statistics, up9.JobPatternsRequest(job_patterns=[pattern])))
+
+def run_scenario(name, pattern):
+    """Child side: run one scenario and print its wall time and peak RSS as JSON."""
+    import jobsched_env
+    # No `module load` here: it could put the real autorep back in front of the fake
+    jobsched_env._envs[jobsched_env.MODULE] = os.environ.copy()
+
+    started = time.perf_counter()
+    globals()[f'scenario_{name}'](pattern)
+    wall = time.perf_counter() - started
+    print(json.dumps({'wall': wall, 'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+
+def launch(name, args, workdir):
+    """Parent side: run a scenario in a child process and collect its numbers."""
+    bin_dir = os.path.join(workdir, 'bin')
+    scenario_dir = os.path.join(workdir, name)  # own cwd, so history stores start empty
+    os.makedirs(scenario_dir)
+    call_log = os.path.join(scenario_dir, 'autorep_calls.log')
+
+    env = dict(os.environ,
+               PATH=bin_dir + os.pathsep + os.environ.get('PATH', ''),
+               PYTHONPATH=REPO + os.pathsep + os.environ.get('PYTHONPATH', ''),
+               FAKE_AUTOREP_JOBS=str(args.jobs),
+               FAKE_AUTOREP_MAX_RUNS=str(args.runs),
+               FAKE_AUTOREP_LATENCY=str(args.latency),
+               FAKE_AUTOREP_ROW_LATENCY=str(args.row_latency),
+               FAKE_AUTOREP_LOG=call_log)
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-scenario', name, '--pattern', args.pattern],
+                            cwd=scenario_dir, env=env, capture_output=True, text=True, timeout=args.timeout)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        return {'error': (result.stderr.strip().splitlines() or ['exit %d' % result.returncode])[-1], 'wall': elapsed}
+
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    stats['autorep_calls'] = 0
+    if os.path.exists(call_log):
+        with open(call_log) as f:
+            stats['autorep_calls'] = sum(1 for _ in f)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the Autosys export paths against a fake autorep")
+    parser.add_argument('--jobs', type=int, default=500, help="Jobs on the fake instance")
+    parser.add_argument('--runs', type=int, default=90, help="History rows per job returned for -r (capped by what is asked)")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds each autorep call takes before answering")
+    parser.add_argument('--row-latency', type=float, default=0.0, help="Extra seconds per row autorep prints")
+    parser.add_argument('--pattern', default='PRD_%', help="Job pattern every scenario asks for")
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help="Scenario to run, repeat for several (default: all)")
+    parser.add_argument('--timeout', type=float, default=1800, help="Give up on a scenario after this many seconds")
+    parser.add_argument('--run-scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        run_scenario(args.run_scenario, args.pattern)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench_autosys_')
+    try:
+        bin_dir = os.path.join(workdir, 'bin')
+        os.makedirs(bin_dir)
+        wrapper = os.path.join(bin_dir, 'autorep')
+        with open(wrapper, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_AUTOREP}" "$@"\n')
+        os.chmod(wrapper, 0o755)
+
+        print(f"{args.jobs} jobs, up to {args.runs} history rows each, {args.latency * 1000:.0f} ms per autorep call")
+        print(f"{'scenario':<12} {'wall s':>9} {'autorep calls':>14} {'peak RSS MB':>12}")
+        for name in args.scenario or SCENARIOS:
+            stats = launch(name, args, workdir)
+            if 'error' in stats:
+                print(f"{name:<12} {stats['wall']:>9.2f}  FAILED: {stats['error']}")
+                continue
+            print(f"{name:<12} {stats['wall']:>9.2f} {stats['autorep_calls']:>14} {stats['peak_rss_kb'] / 1024:>12.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+import re
+import time
+import random
+import argparse
+import tempfile
+from collections import Counter
+from log_matcher import LineMatcher
+
+# Micro-benchmark: the per-keyword loops of fr3.py, fc6.py and pu6.py against
+# LineMatcher, on a synthetic log (about 1 line in 50 matches something).
+# Each pair must produce the same counts, so this doubles as an equivalence check.
+#
+#   python bench_log_matcher.py --size-mb 2048
+
+FR3_PATTERNS = {"error": re.compile(r'\b\w+Error\b', re.IGNORECASE),
+                "exception": re.compile(r'\b\w+Exception\b', re.IGNORECASE)}
+FR3_KEYWORDS = ["timeout", "database", "failure"]
+FC6_PATTERNS = {"error": re.compile(r"\b(error|fail|fatal|critical)\b", re.IGNORECASE),
+                "exception": re.compile(r"\b(\w*Exception|Throwable|Error:)\b", re.IGNORECASE)}
+FC6_KEYWORDS = ["timeout", "connection failed", "refused"]
+PU6_PATTERNS = {"error": re.compile(r"\b\w*Error\w*\b", re.IGNORECASE),
+                "exception": re.compile(r"\b\w*Exception\w*\b", re.IGNORECASE),
+                "custom": re.compile("timeout|connection refused|failed to connect", re.IGNORECASE)}
+
+CLEAN = ["INFO  [main] c.e.batch.Loader - loaded {n} rows from staging in {ms} ms",
+         "DEBUG [pool-3-thread-{t}] c.e.http.Client - GET /api/v2/items/{n} 200 {ms}ms",
+         "INFO  [scheduler] c.e.jobs.Runner - job PRD_FIN_{n} started on host app{t}"]
+DIRTY = ["ERROR [main] c.e.db.Pool - SQLTimeoutError: database timeout after {ms} ms",
+         "WARN  [pool-3-thread-{t}] java.net.ConnectException: Connection refused (port {n})",
+         "ERROR [worker-{t}] c.e.jobs.Runner - NullPointerException at line {n}; job failure",
+         "FATAL [main] critical: failed to connect to broker after {ms} ms, connection failed"]
+
+def make_log(path, size_mb):
+    rng = random.Random(42)
+    target = size_mb * 1024 * 1024
+    with open(path, 'w') as f:
+        written = 0
+        while written < target:
+            lines = []
+            for _ in range(10000):
+                template = rng.choice(DIRTY) if rng.random() < 0.02 else rng.choice(CLEAN)
+                lines.append(template.format(n=rng.randrange(10 ** 6), ms=rng.randrange(5000), t=rng.randrange(32)))
+            chunk = '\n'.join(lines) + '\n'
+            f.write(chunk)
+            written += len(chunk)
+
+def fr3_loop(lines):
+    counts = Counter()
+    for line in lines:
+        if FR3_PATTERNS["error"].search(line):
+            counts["error"] += 1
+        if FR3_PATTERNS["exception"].search(line):
+            counts["exception"] += 1
+        for keyword in FR3_KEYWORDS:
+            if keyword.lower() in line.lower():
+                counts[keyword] += 1
+    return counts
+
+def fr3_matcher(lines, matcher=LineMatcher(FR3_PATTERNS, FR3_KEYWORDS)):
+    counts = Counter()
+    for line in lines:
+        found, keywords = matcher.scan(line)
+        counts.update(found.keys())
+        counts.update(keywords)
+    return counts
+
+def fc6_loop(lines):
+    counts = Counter()
+    for line in lines:
+        for label_type, pattern in FC6_PATTERNS.items():
+            match = pattern.search(line)
+            if match:
+                counts[(label_type, match.group())] += 1
+        for keyword in FC6_KEYWORDS:
+            if keyword.lower() in line.lower():
+                counts[("custom", keyword)] += 1
+    return counts
+
+def fc6_matcher(lines, matcher=LineMatcher(FC6_PATTERNS, FC6_KEYWORDS)):
+    counts = Counter()
+    for line in lines:
+        found, keywords = matcher.scan(line)
+        counts.update(found.items())
+        counts.update(("custom", keyword) for keyword in keywords)
+    return counts
+
+def pu6_loop(lines):
+    counts = Counter()
+    for line in lines:
+        for ktype, pattern in PU6_PATTERNS.items():
+            for match in pattern.findall(line):
+                counts[(ktype, match)] += 1
+    return counts
+
+def pu6_matcher(lines, matcher=LineMatcher(PU6_PATTERNS)):
+    counts = Counter()
+    for line in lines:
+        for ktype, matches in matcher.findall(line).items():
+            for match in matches:
+                counts[(ktype, match)] += 1
+    return counts
+
+def timed(function, path):
+    with open(path, 'r', errors='ignore') as f:
+        started = time.perf_counter()
+        result = function(f)
+        return time.perf_counter() - started, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-keyword loops vs LineMatcher")
+    parser.add_argument('--size-mb', type=int, default=200, help="Size of the generated log")
+    parser.add_argument('--log', help="Use this log instead of generating one")
+    args = parser.parse_args()
+
+    path = args.log
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix='bench_log_matcher_'), 'synthetic.log')
+        print(f"Generating {args.size_mb} MB log at {path} ...")
+        make_log(path, args.size_mb)
+    size_mb = os.path.getsize(path) / 1024 / 1024
+
+    try:
+        for name, old, new in (('fr3', fr3_loop, fr3_matcher), ('fc6', fc6_loop, fc6_matcher), ('pu6', pu6_loop, pu6_matcher)):
+            old_time, old_counts = timed(old, path)
+            new_time, new_counts = timed(new, path)
+            same = 'same counts' if old_counts == new_counts else 'COUNTS DIFFER'
+            print(f"{name}: loop {old_time:6.2f}s ({size_mb / old_time:6.1f} MB/s)   "
+                  f"matcher {new_time:6.2f}s ({size_mb / new_time:6.1f} MB/s)   x{old_time / new_time:.1f}  {same}")
+    finally:
+        if args.log is None:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+if __name__ == "__main__":
+    main()
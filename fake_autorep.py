@@ -0,0 +1,84 @@
+import os
+import re
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+
+# Stand-in for `autorep` so the Autosys scripts can be timed without a scheduler.
+# bench_autosys.py puts a wrapper named `autorep` on PATH that runs this file.
+#
+# FAKE_AUTOREP_JOBS         jobs on the "instance" (default 1000)
+# FAKE_AUTOREP_MAX_RUNS     most history rows per job a -r call returns (default 90)
+# FAKE_AUTOREP_LATENCY      seconds every call waits before answering (default 0.05)
+# FAKE_AUTOREP_ROW_LATENCY  extra seconds per row printed (default 0)
+# FAKE_AUTOREP_DATE_FORMAT  strftime format of Last Start / Last End (default %m/%d/%Y %H:%M:%S)
+# FAKE_AUTOREP_LOG          file that gets one line per call, for counting subprocesses
+
+PREFIXES = ['PRD_FIN_', 'PRD_OPS_', 'PRD_RISK_', 'PRD_REP_']
+STATUSES = ['SU'] * 12 + ['FA', 'FA', 'RU', 'OI', 'OH', 'TE', 'IN', 'AC']
+NOW = datetime.now().replace(second=0, microsecond=0)
+
+def job_names(count):
+    return [f"{PREFIXES[i % len(PREFIXES)]}JOB_{i:06d}" for i in range(count)]
+
+def pattern_regex(pattern):
+    """Autosys wildcards: % and * any run of characters, ? one character."""
+    return re.compile(''.join('.*' if c in '%*' else '.' if c == '?' else re.escape(c) for c in pattern) + r'\Z')
+
+def select_jobs(names, patterns):
+    if 'ALL' in patterns:
+        return names
+    regexes = [pattern_regex(pattern) for pattern in patterns]
+    return [name for name in names if any(regex.match(name) for regex in regexes)]
+
+def run_row(name, run, date_format):
+    """One row for the run `run` days back; the same job and run always print the same thing."""
+    seed = zlib.crc32(f"{name}/{run}".encode())
+    status = STATUSES[seed % len(STATUSES)]
+    if run == 0 and seed % 50 == 0:
+        return name, '-----', '-----', 'IN', '0/0', '0'  # never ran
+    if run and status == 'RU':
+        status = 'SU'  # only the latest run can still be running
+    start = NOW - timedelta(days=run, minutes=seed % 600)
+    end = start + timedelta(seconds=60 + seed % 3600)
+    end_text = '-----' if status == 'RU' else end.strftime(date_format)
+    exit_code = '1' if status == 'FA' else '0'
+    return name, start.strftime(date_format), end_text, status, f"{100000 + seed % 900000}/1", exit_code
+
+def main(argv):
+    args = argv[1:]
+    patterns, runs = [], 0
+    if '-J' in args:
+        patterns = [p.strip() for p in args[args.index('-J') + 1].split(',') if p.strip()]
+    if '-r' in args:
+        runs = min(int(args[args.index('-r') + 1]), int(os.environ.get('FAKE_AUTOREP_MAX_RUNS', '90')))
+
+    log = os.environ.get('FAKE_AUTOREP_LOG')
+    if log:
+        with open(log, 'a') as f:
+            f.write(' '.join(args) + '\n')
+
+    time.sleep(float(os.environ.get('FAKE_AUTOREP_LATENCY', '0.05')))
+    if not patterns:
+        sys.stderr.write("CAUAJM_E_10029 Usage: autorep -J <job_name>\n")
+        return 1
+
+    selected = select_jobs(job_names(int(os.environ.get('FAKE_AUTOREP_JOBS', '1000'))), patterns)
+    if not selected:
+        sys.stderr.write(f"CAUAJM_E_50111 Job Name does not exist: {','.join(patterns)}\n")
+        return 1
+
+    date_format = os.environ.get('FAKE_AUTOREP_DATE_FORMAT', '%m/%d/%Y %H:%M:%S')
+    lines = ["", "Job Name" + " " * 57 + "Last Start           Last End             ST Run/Ntry Pri/Xit",
+             "-" * 64 + " " + "-" * 20 + " " + "-" * 20 + " -- -------- -------"]
+    for name in selected:
+        for run in range(max(runs, 1)):
+            name_text, start, end, status, run_ntry, exit_code = run_row(name, run, date_format)
+            lines.append(f"{name_text:<64} {start:<20} {end:<20} {status} {run_ntry:<8} {exit_code}")
+    time.sleep(float(os.environ.get('FAKE_AUTOREP_ROW_LATENCY', '0')) * (len(lines) - 3))
+    sys.stdout.write('\n'.join(lines) + '\n')
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,10 +1,15 @@
-from prometheus_client import CollectorRegistry, Gauge, pushadd_to_gateway
-import subprocess
+from prometheus_client import CollectorRegistry, pushadd_to_gateway
 import re
 import time
 import logging
 from pathlib import Path
 from collections import defaultdict
+from log_matcher import LineMatcher
+from log_reader import LogReader, line_start
+from log_parallel import scan_in_parallel, with_line_offsets
+from log_labels import OccurrenceTable, SAMPLES_PER_KEY
+from log_compressed import ArchiveCache, compression, open_log
+from log_discovery import find_log_files
 
 # ---------------- CONFIG ----------------
 LOG_DIRECTORY = "/path/to/logs"  # 🔁 Replace with your log directory
@@ -13,6 +18,9 @@ APP_NAME = "my_app"
 ENV = "prod"
 CUSTOM_KEYWORDS = ["timeout", "connection failed", "refused"]
 LOG_EXTENSIONS = [".log", ".err", ".out", ".nohup_log"]
+ARCHIVE_CACHE_FILE = "fc6_archive_cache.json"  # counts of already-scanned .gz/.bz2/.xz rotations
+DISCOVERY_CACHE_FILE = "fc6_discovery_cache.json"  # directory listings, reused while a directory's mtime holds
+SAMPLES_FILE = "fc6_log_samples.json"  # a few line numbers / messages per series
 # ----------------------------------------
 
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s - %(message)s')
@@ -22,75 +30,78 @@ KEYWORDS = {
     "error": re.compile(r"\b(error|fail|fatal|critical)\b", re.IGNORECASE),
     "exception": re.compile(r"\b(\w*Exception|Throwable|Error:)\b", re.IGNORECASE)
 }
+# Built-in patterns and custom keywords behind one literal prefilter per line
+MATCHER = LineMatcher(KEYWORDS, CUSTOM_KEYWORDS)
+# One series per (app, env, folder, file, type, keyword); line numbers go to the sample file
+OCCURRENCES = OccurrenceTable("log_occurrence", "Log keyword occurrences", APP_NAME, ENV)
 
 def discover_log_files(log_dir: str, extensions: list) -> list:
-    files = []
-    for ext in extensions:
-        result = subprocess.run(
-            ["find", log_dir, "-type", "f", "-name", f"*{ext}"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        found = result.stdout.strip().split("\n")
-        files.extend([f for f in found if f.strip()])
-    return files
-
-def aggregate_metrics(filepath: str):
-    folder = str(Path(filepath).parent)
-    metrics = defaultdict(lambda: {"count": 0, "lines": []})
+    """Live logs plus their .gz/.bz2/.xz rotations (app.log.1.gz, app.log-20240101.bz2, ...).
+
+    One os.scandir() walk for all extensions instead of a find per extension.
+    """
+    return find_log_files(log_dir, extensions, cache_file=DISCOVERY_CACHE_FILE)
+
+def aggregate_range(filepath: str, start: int, end):
+    """Counts for the lines starting in byte range [start, end); runs in a worker process.
+
+    Returns (metrics, lines in the range), or (None, 0) if the file couldn't be read; line
+    numbers in metrics count from the range start. Compressed files are decompressed as read.
+    """
+    metrics = {}
+    line_count = 0
 
     try:
-        with open(filepath, "r", errors="ignore") as f:
-            for line_number, line in enumerate(f, 1):
-                # Built-in error/exception
-                for label_type, pattern in KEYWORDS.items():
-                    match = pattern.search(line)
-                    if match:
-                        key = (label_type, match.group(), filepath)
-                        metrics[key]["count"] += 1
-                        if len(metrics[key]["lines"]) < 10:
-                            metrics[key]["lines"].append(str(line_number))
-
-                # Custom keywords
-                for keyword in CUSTOM_KEYWORDS:
-                    if keyword.lower() in line.lower():
-                        key = ("custom", keyword, filepath)
-                        metrics[key]["count"] += 1
-                        if len(metrics[key]["lines"]) < 10:
-                            metrics[key]["lines"].append(str(line_number))
+        # Big binary chunks; only lines holding one of the matcher's words get decoded
+        with open_log(filepath) as f:
+            reader = LogReader(f, MATCHER.prefilter_words())
+            for line_number, line in reader.lines(line_start(f, start), end=end):
+                found, keywords = MATCHER.scan(line)
+
+                # Built-in error/exception, then custom keywords
+                keys = list(found.items())
+                keys += [("custom", keyword) for keyword in keywords]
+                for key in keys:
+                    data = metrics.setdefault(key, {"count": 0, "lines": []})
+                    data["count"] += 1
+                    if len(data["lines"]) < SAMPLES_PER_KEY:
+                        data["lines"].append(line_number)
+            line_count = reader.line_number
 
     except Exception as e:
         logging.error(f"Could not read {filepath}: {e}")
+        return None, 0
 
-    return metrics, folder
+    return metrics, line_count
 
-def push_metrics(aggregated_metrics, folder):
-    registry = CollectorRegistry()
-    gauge = Gauge(
-        "log_occurrence",
-        "Log keyword occurrences",
-        labelnames=["app", "env", "type", "keyword", "file", "folder", "lines"],
-        registry=registry
-    )
-
-    for (label_type, keyword, filepath), data in aggregated_metrics.items():
-        line_str = ",".join(data["lines"])
-        gauge.labels(
-            app=APP_NAME,
-            env=ENV,
-            type=label_type,
-            keyword=keyword,
-            file=Path(filepath).name,
-            folder=folder,
-            lines=line_str
-        ).set(data["count"])
+def merge_ranges(parts):
+    """One file's metrics from its ranges, in file order, with absolute line numbers; None if one failed."""
+    metrics = defaultdict(lambda: {"count": 0, "lines": []})
+    for part, first_line in with_line_offsets(parts):
+        if part is None:
+            return None
+        for key, data in part.items():
+            merged = metrics[key]
+            merged["count"] += data["count"]
+            room = SAMPLES_PER_KEY - len(merged["lines"])
+            merged["lines"].extend(first_line + n for n in data["lines"][:room])
+    return metrics
+
+def record_metrics(aggregated_metrics, filepath):
+    folder = str(Path(filepath).parent)
+    for (label_type, keyword), data in aggregated_metrics.items():
+        OCCURRENCES.add(folder, Path(filepath).name, label_type, keyword, count=data["count"],
+                        samples=[(line_number, None) for line_number in data["lines"]])
 
+def push_metrics():
+    registry = CollectorRegistry()
+    registry.register(OCCURRENCES)
     try:
         pushadd_to_gateway(PUSHGATEWAY_URL, job=APP_NAME, registry=registry)
-        logging.info(f"Pushed {len(aggregated_metrics)} metrics for file: {Path(filepath).name}")
+        logging.info(f"Pushed {len(OCCURRENCES.counts)} series")
     except Exception as e:
         logging.error(f"Push failed: {e}")
+    OCCURRENCES.save_samples(SAMPLES_FILE)
 
 def main():
     log_files = discover_log_files(LOG_DIRECTORY, LOG_EXTENSIONS)
@@ -98,11 +109,25 @@ def main():
         logging.warning("No log files found.")
         return
 
-    for file in log_files:
-        aggregated_metrics, folder = aggregate_metrics(file)
-        if aggregated_metrics:
-            push_metrics(aggregated_metrics, folder)
-
+    # Compressed rotations counted on an earlier run aren't decompressed again
+    cache = ArchiveCache(ARCHIVE_CACHE_FILE, signature=repr((KEYWORDS, CUSTOM_KEYWORDS, SAMPLES_PER_KEY)))
+    log_files, cached = cache.split(log_files)
+    for filepath, rows in cached.items():
+        record_metrics({(label_type, keyword): {"count": count, "lines": lines}
+                        for label_type, keyword, count, lines in rows}, filepath)
+
+    # Files, and byte ranges of big files, are scanned on every core; pushes stay in this process
+    for filepath, parts in scan_in_parallel(log_files, aggregate_range):
+        aggregated_metrics = merge_ranges(parts)
+        if aggregated_metrics is None:
+            continue
+        if compression(filepath):
+            cache.put(filepath, [[label_type, keyword, data["count"], data["lines"]]
+                                 for (label_type, keyword), data in aggregated_metrics.items()])
+        record_metrics(aggregated_metrics, filepath)
+
+    push_metrics()
+    cache.save()
     logging.info("All done.")
 
 if __name__ == "__main__":
@@ -4,6 +4,9 @@ import re
 import time
 import logging
 from pathlib import Path
+from log_matcher import LineMatcher
+from log_reader import LogReader, line_start
+from log_parallel import scan_in_parallel, with_line_offsets
 
 # ---------------- CONFIG ----------------
 LOG_DIRECTORY = "/path/to/logs"  # 🔁 Replace with your log directory
@@ -21,6 +24,7 @@ KEYWORDS = {
     "error": re.compile(r"\b(error|fail|fatal|critical)\b", re.IGNORECASE),
     "exception": re.compile(r"\b(\w*Exception|Throwable|Error:)\b", re.IGNORECASE)
 }
+MATCHER = LineMatcher(KEYWORDS, CUSTOM_KEYWORDS)
 
 def discover_log_files(log_dir: str, extensions: list) -> list:
     files = []
@@ -61,23 +65,34 @@ def push_metric(label_type, keyword, filename, folder_name, line_number):
     except Exception as e:
         logging.error(f"Push failed: {e}")
 
-def scan_file_for_keywords(filepath: str):
-    folder = str(Path(filepath).parent)
-    try:
-        with open(filepath, "r", errors="ignore") as f:
-            for line_number, line in enumerate(f, 1):
-                # Standard error & exception checks
-                for label_type, pattern in KEYWORDS.items():
-                    match = pattern.search(line)
-                    if match:
-                        push_metric(label_type, match.group(), filepath, folder, line_number)
+def find_occurrences(filepath: str, start: int, end):
+    """[(label_type, keyword, line_number)] for lines starting in byte range [start, end).
 
-                # Custom keyword checks
-                for keyword in CUSTOM_KEYWORDS:
-                    if keyword.lower() in line.lower():
-                        push_metric("custom", keyword, filepath, folder, line_number)
+    Runs in a worker process; line numbers count from the range start. Returns
+    (occurrences, lines in the range), (None, 0) if the file couldn't be read.
+    """
+    occurrences = []
+    try:
+        with open(filepath, "rb") as f:
+            reader = LogReader(f, MATCHER.prefilter_words())
+            for line_number, line in reader.lines(line_start(f, start), end=end):
+                # Standard error & exception checks, then custom keyword checks
+                found, keywords = MATCHER.scan(line)
+                occurrences.extend((label_type, text, line_number) for label_type, text in found.items())
+                occurrences.extend(("custom", keyword, line_number) for keyword in keywords)
+            return occurrences, reader.line_number
     except Exception as e:
         logging.error(f"Could not read {filepath}: {e}")
+        return None, 0
+
+def push_occurrences(filepath: str, parts):
+    """Pushes a file's occurrences with absolute line numbers; nothing if a range failed."""
+    if any(occurrences is None for occurrences, _ in parts):
+        return
+    folder = str(Path(filepath).parent)
+    for occurrences, first_line in with_line_offsets(parts):
+        for label_type, keyword, line_number in occurrences:
+            push_metric(label_type, keyword, filepath, folder, first_line + line_number)
 
 def main():
     log_files = discover_log_files(LOG_DIRECTORY, LOG_EXTENSIONS)
@@ -86,9 +101,10 @@ def main():
         return
 
     logging.info(f"Found {len(log_files)} log files.")
-    for file in log_files:
-        logging.info(f"Scanning: {file}")
-        scan_file_for_keywords(file)
+    # Files, and byte ranges of big files, are scanned on every core; pushes stay in this process
+    for file, parts in scan_in_parallel(log_files, find_occurrences):
+        logging.info(f"Scanned: {file}")
+        push_occurrences(file, parts)
 
     logging.info("All done.")
 
@@ -2,7 +2,7 @@ import subprocess
 import re
 import logging
 from datetime import datetime
-from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+from metrics_buffer import MetricsBuffer
 
 # === CONFIGURATION ===
 LOG_DIR = "/path/to/logs"  # 🔧 Update this path
@@ -12,6 +12,7 @@ EXCEPTION_REGEX = r"\b([A-Z][a-zA-Z0-9]+Exception)\b"
 PUSHGATEWAY_URL = "http://your-pushgateway:9091"  # 🔧 Update this URL
 APP_NAME = "my_app"
 ENV = "prod"
+METRICS = MetricsBuffer(PUSHGATEWAY_URL)
 
 # === LOGGING SETUP ===
 logging.basicConfig(
@@ -28,44 +29,29 @@ def safe_metric_name(name: str) -> str:
     name = name.lower().replace(" ", "_")
     return re.sub(r'\W|^(?=\d)', '_', name)
 
-def push_metric(keyword_type, keyword_value, count, file_path, line_number):
+def push_metric(keyword_type, keyword_value, count, file_path):
     filename = file_path.split("/")[-1]
     folder = "/".join(file_path.split("/")[:-1]) or "/"
 
-    registry = CollectorRegistry()
-
     metric_name = safe_metric_name(f"log_occurrence_{keyword_type}_{keyword_value}")
     description = f"Occurrences of {keyword_type}: {keyword_value}"
 
-    g = Gauge(
+    # Buffered; main() pushes every series in one job, in one request
+    METRICS.set(
+        f"{APP_NAME}_{ENV}_log_monitor",
         metric_name,
         description,
-        labelnames=[
-            "app_name", "env", "filename", "folder", "path",
-            "date", "line_number"
-        ],
-        registry=registry
+        {
+            "app_name": APP_NAME,
+            "env": ENV,
+            "filename": filename,
+            "folder": folder,
+            "path": file_path,
+            "date": datetime.now().strftime("%Y-%m-%d")
+        },
+        count
     )
 
-    g.labels(
-        app_name=APP_NAME,
-        env=ENV,
-        filename=filename,
-        folder=folder,
-        path=file_path,
-        date=datetime.now().strftime("%Y-%m-%d"),
-        line_number=str(line_number)
-    ).set(count)
-
-    try:
-        push_to_gateway(
-            PUSHGATEWAY_URL,
-            job=f"{APP_NAME}_{ENV}_{keyword_type}_{safe_metric_name(keyword_value)}",
-            registry=registry
-        )
-    except Exception as e:
-        logging.error(f"❌ Failed to push metric {metric_name}: {e}")
-
 def process_log_file(file_path):
     logging.info(f"📄 Processing file: {file_path}")
     try:
@@ -79,31 +65,29 @@ def process_log_file(file_path):
     exception_map = {}
     custom_map = {}
 
-    for i, line in enumerate(lines, start=1):
+    # Counted per keyword and file; a series per line number grew with every log line
+    for line in lines:
         # Errors
         for match in re.findall(ERROR_REGEX, line):
-            key = (match, i)
-            error_map[key] = error_map.get(key, 0) + 1
+            error_map[match] = error_map.get(match, 0) + 1
 
         # Exceptions
         for match in re.findall(EXCEPTION_REGEX, line):
-            key = (match, i)
-            exception_map[key] = exception_map.get(key, 0) + 1
+            exception_map[match] = exception_map.get(match, 0) + 1
 
         # Custom keywords
         for keyword in CUSTOM_KEYWORDS:
             if keyword in line:
-                key = (keyword, i)
-                custom_map[key] = custom_map.get(key, 0) + 1
+                custom_map[keyword] = custom_map.get(keyword, 0) + 1
 
-    for (err, lineno), count in error_map.items():
-        push_metric("error", err, count, file_path, lineno)
+    for err, count in error_map.items():
+        push_metric("error", err, count, file_path)
 
-    for (ex, lineno), count in exception_map.items():
-        push_metric("exception", ex, count, file_path, lineno)
+    for ex, count in exception_map.items():
+        push_metric("exception", ex, count, file_path)
 
-    for (kw, lineno), count in custom_map.items():
-        push_metric("custom", kw, count, file_path, lineno)
+    for kw, count in custom_map.items():
+        push_metric("custom", kw, count, file_path)
 
 def find_log_files(log_dir):
     try:
@@ -125,6 +109,10 @@ def main():
     for log_file in log_files:
         process_log_file(log_file)
 
+    METRICS.flush(force=True)
+    if METRICS.pending():
+        logging.error("❌ Failed to push metrics.")
+        return
     logging.info("✅ All metrics pushed successfully.")
 
 if __name__ == "__main__":
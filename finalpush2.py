@@ -2,7 +2,7 @@ import subprocess
 import re
 import logging
 from datetime import datetime
-from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+from metrics_buffer import MetricsBuffer
 
 # === CONFIGURATION ===
 LOG_DIR = "/path/to/logs"  # <-- Change this to your actual log directory
@@ -12,6 +12,7 @@ EXCEPTION_REGEX = r"\b([A-Z][a-zA-Z0-9]+Exception)\b"
 PUSHGATEWAY_URL = "http://your-pushgateway:9091"
 APP_NAME = "my_app"
 ENV = "prod"
+METRICS = MetricsBuffer(PUSHGATEWAY_URL)
 
 # === LOGGING SETUP ===
 logging.basicConfig(
@@ -27,37 +28,21 @@ def push_metric(keyword_type, keyword_value, count, file_path, line_content, lin
     filename = file_path.split("/")[-1]
     folder = "/".join(file_path.split("/")[:-1]) or "/"
 
-    registry = CollectorRegistry()
-    g = Gauge(
-        'log_keyword_occurrences',
-        'Count of keyword occurrences in logs',
-        labelnames=[
-            "app_name", "env", "keyword_type", "keyword", "line_content",
-            "filename", "folder", "path", "date", "mode", "line_number"
-        ],
-        registry=registry
-    )
-
-    g.labels(
-        app_name=APP_NAME,
-        env=ENV,
-        keyword_type=keyword_type,
-        keyword=keyword_value,
-        line_content=line_content.strip()[:200],
-        filename=filename,
-        folder=folder,
-        path=file_path,
-        date=datetime.now().strftime("%Y-%m-%d"),
-        mode="historical",
-        line_number=str(line_number)
-    ).set(count)
-
+    # Buffered; main() pushes all of them in one request
     job_name = f"{APP_NAME}_{ENV}_log_monitor"
-    try:
-        push_to_gateway(PUSHGATEWAY_URL, job=job_name, registry=registry)
-        logging.info(f"Pushed {keyword_type.upper()} '{keyword_value}' at line {line_number} from {file_path}")
-    except Exception as e:
-        logging.error(f"Failed to push metrics: {e}")
+    METRICS.set(job_name, 'log_keyword_occurrences', 'Count of keyword occurrences in logs', {
+        "app_name": APP_NAME,
+        "env": ENV,
+        "keyword_type": keyword_type,
+        "keyword": keyword_value,
+        "line_content": line_content.strip()[:200],
+        "filename": filename,
+        "folder": folder,
+        "path": file_path,
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "mode": "historical",
+        "line_number": str(line_number)
+    }, count)
 
 def process_log_file(file_path):
     logging.info(f"Processing file: {file_path}")
@@ -120,6 +105,9 @@ def main():
     for log_file in log_files:
         process_log_file(log_file)
 
+    METRICS.flush(force=True)
+    if METRICS.pending():
+        logging.error("Failed to push metrics.")
     logging.info("Finished processing all log files.")
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
-from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
-import subprocess
-import hashlib
+from prometheus_client import CollectorRegistry, push_to_gateway
+from log_checkpoint import CheckpointStore
+from log_matcher import LineMatcher
+from log_labels import OccurrenceTable
+from log_fingerprint import TemplateCounter
 import os
 import re
 
@@ -9,17 +11,24 @@ LOG_PATH = "/path/to/your/logs"  # Change this
 ENV = "prod"
 APP_NAME = "my-app"
 PUSHGATEWAY_URL = "http://localhost:9091"
-PROCESSED_LOG_FILE = "processed_logs.txt"
+CHECKPOINT_FILE = "fpo_checkpoints.json"  # byte offset per file, not a hash per matched line
 LOG_EXTENSIONS = ('.log', '.err', '.out', '.nohup_log')
+SAMPLES_FILE = "fpo_log_samples.json"  # a few line numbers / messages per series
+TEMPLATE_OUTPUT = "fpo_log_templates.txt"  # top matched-line templates of the run
 
 # --- METRICS SETUP ---
+# Occurrences counted per (app, env, folder, file, type, matched text); line numbers and
+# messages are kept as bounded samples in SAMPLES_FILE instead of labels
 registry = CollectorRegistry()
-log_metric = Gauge(
+log_metric = OccurrenceTable(
     'log_occurrence',
-    'Detected log line occurrence with labels',
-    ['app_name', 'env', 'file_name', 'folder', 'line_number', 'error_type', 'error_message'],
-    registry=registry
+    'Detected log line occurrences with labels',
+    APP_NAME, ENV,
+    labelnames=['app_name', 'env', 'folder', 'file_name', 'error_type', 'error_message']
 )
+registry.register(log_metric)
+# Matched lines grouped by template (ids, numbers, paths masked) -> TEMPLATE_OUTPUT
+templates = TemplateCounter()
 
 # --- REGEX PATTERNS ---
 ERROR_PATTERNS = {
@@ -27,54 +36,23 @@ ERROR_PATTERNS = {
     'exception': re.compile(r'\b(exception)\b', re.IGNORECASE),
     'custom': re.compile(r'\b(sql|timeout|connection refused|denied)\b', re.IGNORECASE)
 }
-
-# --- Load previously processed entries ---
-def load_processed_entries():
-    seen = set()
-    if os.path.exists(PROCESSED_LOG_FILE):
-        with open(PROCESSED_LOG_FILE, 'r') as f:
-            for line in f:
-                seen.add(line.strip())
-    return seen
-
-# --- Save new entry to file ---
-def save_processed_entry(entry):
-    with open(PROCESSED_LOG_FILE, 'a') as f:
-        f.write(entry + '\n')
+# Words one of which a line needs for any pattern to match; other lines are never decoded
+PREFILTER_WORDS = LineMatcher(ERROR_PATTERNS).prefilter_words()
 
 # --- Process individual log file ---
-def process_log_file(filepath, seen_entries):
+def process_log_file(filepath, checkpoints):
     try:
-        result = subprocess.run(['cat', filepath], capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"Failed to read: {filepath}")
-            return
-
-        lines = result.stdout.splitlines()
         folder, file_name = os.path.split(filepath)
 
-        for i, line in enumerate(lines, start=1):
+        # Only the lines added since the last run; the checkpoint resumes with seek()
+        for i, line in checkpoints.read_new_lines(filepath, needles=PREFILTER_WORDS):
             for error_type, pattern in ERROR_PATTERNS.items():
-                if pattern.search(line):
-                    match = pattern.search(line)
-                    matched_text = match.group()
-
-                    hash_key = hashlib.md5(f"{filepath}:{i}:{line}".encode()).hexdigest()
-                    if hash_key in seen_entries:
-                        continue
-
-                    seen_entries.add(hash_key)
-                    save_processed_entry(hash_key)
-
-                    log_metric.labels(
-                        app_name=APP_NAME,
-                        env=ENV,
-                        file_name=file_name,
-                        folder=folder,
-                        line_number=str(i),
-                        error_type=error_type,
-                        error_message=matched_text
-                    ).set(1)
+                match = pattern.search(line)
+                if match:
+                    matched_text = match.group().lower()
+                    log_metric.add(folder, file_name, error_type, matched_text,
+                                   samples=[(i, line.strip()[:500])])
+                    templates.add(f"{error_type}: {line.strip()}", example=f"{filepath}:{i}: {line.strip()[:500]}")
     except Exception as e:
         print(f"Error processing file {filepath}: {e}")
 
@@ -88,12 +66,15 @@ def push_metrics():
 
 # --- Main Execution ---
 def main():
-    seen_entries = load_processed_entries()
+    checkpoints = CheckpointStore(CHECKPOINT_FILE)
     for root, _, files in os.walk(LOG_PATH):
         for file in files:
             if file.endswith(LOG_EXTENSIONS):
-                process_log_file(os.path.join(root, file), seen_entries)
+                process_log_file(os.path.join(root, file), checkpoints)
     push_metrics()
+    log_metric.save_samples(SAMPLES_FILE)
+    templates.save_top(TEMPLATE_OUTPUT)
+    checkpoints.save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,13 @@
 import re
-import json
-import hashlib
 import logging
 from pathlib import Path
 from datetime import datetime
 from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+from log_checkpoint import CheckpointStore
+from log_matcher import LineMatcher
+from log_parallel import map_in_parallel
+from log_fingerprint import TemplateCounter
+from log_discovery import find_log_files
 
 # === CONFIG ===
 LOG_DIR = "/path/to/logs"  # ✅ Replace with your actual log directory
@@ -12,8 +15,9 @@ APP_NAME = "my_app"
 ENV = "prod"
 CUSTOM_KEYWORDS = ["timeout", "database", "failure"]
 PUSHGATEWAY_URL = "http://localhost:9091"
-LOG_MATCH_OUTPUT = "log_matches.txt"
-STATE_FILE = "processed_entries.json"
+LOG_TEMPLATE_OUTPUT = "log_templates.txt"  # top matched-line templates of the run, not every line
+STATE_FILE = "fr3_checkpoints.json"  # byte offset per file, not a hash per matched line
+DISCOVERY_CACHE_FILE = "fr3_discovery_cache.json"  # directory listings, reused while a directory's mtime holds
 
 # === LOGGING SETUP ===
 logging.basicConfig(
@@ -25,65 +29,56 @@ logging.basicConfig(
 # === PATTERNS ===
 ERROR_PATTERN = re.compile(r'\b\w+Error\b', re.IGNORECASE)
 EXCEPTION_PATTERN = re.compile(r'\b\w+Exception\b', re.IGNORECASE)
+MATCHER = LineMatcher({"error": ERROR_PATTERN, "exception": EXCEPTION_PATTERN}, CUSTOM_KEYWORDS)
 
-def load_state():
-    if Path(STATE_FILE).exists():
-        with open(STATE_FILE, "r") as f:
-            return json.load(f)
-    return {}
+def scan_new_lines(file_path: Path, entries: dict):
+    """Counts and matched-line templates in what was added to one file; runs in a worker process.
 
-def save_state(state):
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f)
-
-def get_line_hash(line):
-    return hashlib.md5(line.encode("utf-8")).hexdigest()
-
-def process_log_file(file_path: Path, state: dict):
+    `entries` is the file's checkpoint; the updated one comes back with the results.
+    """
+    checkpoints = CheckpointStore(None, entries)
     error_count = 0
     exception_count = 0
     custom_keyword_count = 0
-    match_details = []
-
-    file_id = str(file_path.resolve())
-    file_state = state.get(file_id, [])
+    templates = TemplateCounter()
 
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for idx, line in enumerate(f, start=1):
-                line_hash = f"{file_path}:{idx}:{get_line_hash(line)}"
-                if line_hash in file_state:
-                    continue  # Already processed
-
-                matched = False
-                if ERROR_PATTERN.search(line):
-                    error_count += 1
-                    match_details.append(f"{file_path.name}:{idx}: ERROR: {line.strip()}")
-                    matched = True
-                if EXCEPTION_PATTERN.search(line):
-                    exception_count += 1
-                    match_details.append(f"{file_path.name}:{idx}: EXCEPTION: {line.strip()}")
-                    matched = True
-                for keyword in CUSTOM_KEYWORDS:
-                    if keyword.lower() in line.lower():
-                        custom_keyword_count += 1
-                        match_details.append(f"{file_path.name}:{idx}: KEYWORD({keyword}): {line.strip()}")
-                        matched = True
-
-                if matched:
-                    file_state.append(line_hash)
+        # Only lines added since the last run (the checkpoint resumes with seek()), and of
+        # those only the ones holding one of the patterns' words are decoded and matched
+        for idx, line in checkpoints.read_new_lines(file_path, needles=MATCHER.prefilter_words()):
+            found, keywords = MATCHER.scan(line)
+            # Lines differing only in ids, numbers, paths, ... share one template entry
+            kinds = []
+            if "error" in found:
+                error_count += 1
+                kinds.append("ERROR")
+            if "exception" in found:
+                exception_count += 1
+                kinds.append("EXCEPTION")
+            for keyword in keywords:
+                custom_keyword_count += 1
+                kinds.append(f"KEYWORD({keyword})")
+            for kind in kinds:
+                message = f"{kind}: {line.strip()}"
+                templates.add(message, example=f"{file_path.name}:{idx}: {message}")
 
     except Exception as e:
         logging.error(f"Error reading file {file_path}: {e}")
+        return None
+
+    return error_count, exception_count, custom_keyword_count, templates, checkpoints.entries
+
+def report_file(file_path: Path, checkpoints: CheckpointStore, result, templates: TemplateCounter):
+    """Adds the file's templates to the run's, pushes the counts and moves the file's checkpoint."""
+    if result is None:
         return
+    error_count, exception_count, custom_keyword_count, file_templates, entries = result
+    checkpoints.entries.update(entries)
 
     if error_count + exception_count + custom_keyword_count == 0:
         return
 
-    # Save matched lines
-    with open(LOG_MATCH_OUTPUT, "a") as f:
-        for entry in match_details:
-            f.write(entry + "\n")
+    templates.update(file_templates)
 
     # === PUSH METRICS ===
     try:
@@ -108,19 +103,22 @@ def process_log_file(file_path: Path, state: dict):
     except Exception as e:
         logging.error(f"Error pushing to Prometheus: {e}")
 
-    # Save updated state
-    state[file_id] = file_state
-
 def scan_logs():
-    state = load_state()
+    checkpoints = CheckpointStore(STATE_FILE)
+    templates = TemplateCounter()
     extensions = [".log", ".out", ".err", ".nohup_log"]
-    all_files = list(Path(LOG_DIR).rglob("*"))
-    target_files = [f for f in all_files if f.suffix in extensions and f.is_file()]
-
-    for log_file in target_files:
-        process_log_file(log_file, state)
-
-    save_state(state)
+    # One os.scandir() walk, filtering names as it goes, instead of materialising every path
+    target_files = [Path(f) for f in find_log_files(LOG_DIR, extensions, compressed=False,
+                                                     cache_file=DISCOVERY_CACHE_FILE)]
+
+    # Files are read on every core; merging templates, pushing and checkpoints stay here
+    arguments = [(log_file, checkpoints.entries_for(log_file)) for log_file in target_files]
+    for log_file, result in zip(target_files, map_in_parallel(scan_new_lines, arguments)):
+        report_file(log_file, checkpoints, result, templates)
+
+    # Top 50 templates of everything matched this run, with a count and one example each
+    templates.save_top(LOG_TEMPLATE_OUTPUT)
+    checkpoints.save()
     logging.info("✅ All logs processed.")
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from autorep_parser import iter_autorep
+
+CATALOG_MAX_AGE = 300  # seconds before the next lookup triggers a fresh `autorep -J ALL`
+
+# Autosys wildcards: % and * match any run of characters, ? one character. '_' is literal.
+WILDCARDS = re.compile(r'[%*?]')
+
+@lru_cache(maxsize=4096)
+def compile_pattern(pattern):
+    """(literal prefix, compiled regex or None when the pattern is just prefix + one trailing wildcard)."""
+    match = WILDCARDS.search(pattern)
+    if match is None:
+        return pattern, re.compile(re.escape(pattern) + r'\Z')
+    prefix = pattern[:match.start()]
+    rest = pattern[match.start():]
+    if rest in ('%', '*'):
+        return prefix, None
+    regex = ''.join('.*' if c in '%*' else '.' if c == '?' else re.escape(c) for c in pattern)
+    return prefix, re.compile(regex + r'\Z', re.DOTALL)
+
+def matches(job_name, pattern):
+    """Whether one job name matches an Autosys pattern, read as JobCatalog.match reads it (ALL, comma lists)."""
+    for part in pattern.split(','):
+        part = part.strip()
+        if part == 'ALL':
+            return True
+        if not part:
+            continue
+        prefix, regex = compile_pattern(part)
+        if job_name.startswith(prefix) and (regex is None or regex.match(job_name) is not None):
+            return True
+    return False
+
+class JobCatalog:
+    """Every job name on the instance, sorted, so patterns resolve without asking autorep.
+
+    A pattern's literal prefix narrows the search to a bisected slice of the sorted names;
+    only the names in that slice are checked against the rest of the pattern.
+    """
+
+    def __init__(self, max_age=CATALOG_MAX_AGE):
+        self.max_age = max_age
+        self.names = []
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def load(self, names):
+        self.names = sorted(set(names))
+        self.loaded_at = time.monotonic()
+
+    def refresh(self):
+        """Reloads the catalog with a single `autorep -J ALL`."""
+        self.load(row.job_name for row in iter_autorep(['-J', 'ALL']))
+
+    def refresh_if_stale(self):
+        with self.lock:
+            if self.loaded_at is None or time.monotonic() - self.loaded_at >= self.max_age:
+                self.refresh()
+
+    def match(self, pattern):
+        """Sorted job names matching one Autosys pattern (comma-joined lists are split)."""
+        if ',' in pattern:
+            return self.expand(pattern.split(','))
+        if pattern.strip() == 'ALL':
+            return list(self.names)  # autorep -J ALL: every job, not one named ALL
+        prefix, regex = compile_pattern(pattern.strip())
+        names = self.names  # a concurrent load() swaps the list, it never mutates it
+        lo = bisect_left(names, prefix)
+        hi = bisect_right(names, prefix + '\U0010ffff', lo)
+        if regex is None:
+            return names[lo:hi]
+        return [name for name in names[lo:hi] if regex.match(name)]
+
+    def expand(self, patterns):
+        """All job names matching any of the patterns, sorted and without duplicates."""
+        if len(patterns) == 1:
+            return self.match(patterns[0])
+        return sorted({name for pattern in patterns for name in self.match(pattern)})
+
+    def unknown(self, patterns):
+        """The patterns that match no job at all (typos, retired jobs)."""
+        return [pattern for pattern in patterns if not self.match(pattern)]
+
+_catalog = JobCatalog()
+
+def get_catalog():
+    """Shared catalog, refreshed from autorep when older than CATALOG_MAX_AGE."""
+    _catalog.refresh_if_stale()
+    return _catalog
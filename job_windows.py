@@ -0,0 +1,57 @@
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+# Single-pass window aggregation: every run's timestamp is parsed once, runs are sorted
+# once, and each window boundary is one bisect into that sorted list.
+
+FAILURE_STATUSES = ("FA", "FAILURE")
+
+def parse_runs(history, date_key="date", date_format="%Y-%m-%d"):
+    """[{date, status}, ...] -> [(timestamp, status), ...] sorted by time; bad dates are dropped."""
+    runs = []
+    for entry in history:
+        try:
+            runs.append((datetime.strptime(entry[date_key], date_format).timestamp(), entry["status"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    runs.sort()
+    return runs
+
+def window_cutoffs(time_ranges, now=None):
+    """[(period, cutoff_timestamp), ...], newest cutoff (shortest window) first."""
+    now = now if now is not None else time.time()
+    return sorted(((period, now - days * 86400) for period, days in time_ranges.items()),
+                  key=lambda item: item[1], reverse=True)
+
+def count_in_windows(times, time_ranges, now=None):
+    """How many of the sorted `times` fall in each window; one bisect per window."""
+    now = now if now is not None else time.time()
+    total = len(times)
+    return {period: total - bisect_left(times, now - days * 86400) for period, days in time_ranges.items()}
+
+def aggregate_windows(runs, time_ranges, now=None):
+    """Failures and other statuses per window for sorted (timestamp, status) runs.
+
+    Windows are nested, so one backwards walk from the newest run visits each run at
+    most once: counts for a window are the next-shorter window's counts plus the runs
+    between the two boundaries.
+    """
+    times = [run[0] for run in runs]
+    stats = {}
+    failures = 0
+    other_statuses = {}
+    position = len(runs)
+
+    for period, cutoff in window_cutoffs(time_ranges, now):
+        start = bisect_left(times, cutoff)
+        for _, status in runs[start:position]:
+            if status in FAILURE_STATUSES:
+                failures += 1
+            else:
+                other_statuses[status] = other_statuses.get(status, 0) + 1
+        position = min(position, start)
+        stats[period] = {"failures": failures, "other_statuses": dict(other_statuses)}
+
+    # Keep the caller's window order in the result
+    return {period: stats[period] for period in time_ranges}
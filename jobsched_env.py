@@ -0,0 +1,41 @@
+import os
+import shlex
+import subprocess
+import threading
+
+MODULE = "jobsched/QNA"
+ENV_MARKER = "__JOBSCHED_ENV__\n"
+
+_envs = {}
+_lock = threading.Lock()
+
+def capture_module_env(module=MODULE):
+    """Runs `module load` once in a login shell and returns the environment it leaves behind."""
+    # Module chatter goes to stderr; the marker skips anything a login profile echoes to stdout
+    command = f"module load {shlex.quote(module)} 1>&2 && printf '{ENV_MARKER}' && env -0"
+    result = subprocess.run(["/bin/bash", "-lc", command], capture_output=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(f"Module Load Failed: {result.stderr.decode(errors='replace').strip()}")
+
+    env = {}
+    dump = result.stdout.decode(errors='replace').partition(ENV_MARKER)[2]
+    for entry in dump.split('\0'):
+        name, sep, value = entry.partition('=')
+        if sep and name:
+            env[name] = value
+    return env
+
+def get_jobsched_env(module=MODULE):
+    """Environment to pass as env= to every autorep exec; captured on first use, then reused.
+
+    If the module can't be loaded (no Environment Modules on this host) the current
+    environment is used, same as the old scripts that ran autorep without it.
+    """
+    with _lock:
+        if module not in _envs:
+            try:
+                _envs[module] = capture_module_env(module)
+            except (RuntimeError, OSError, subprocess.TimeoutExpired) as e:
+                print(f"WARNING: {e}; running autorep with the current environment")
+                _envs[module] = os.environ.copy()
+        return _envs[module]
@@ -0,0 +1,88 @@
+import os
+import json
+import hashlib
+from log_reader import LogReader
+
+HEAD_BYTES = 1024  # the first KB tells a reused inode apart from the file we checkpointed
+
+def head_fingerprint(f, length=HEAD_BYTES):
+    """(sha1 hex, bytes hashed) of the start of an open binary file."""
+    f.seek(0)
+    head = f.read(length)
+    return hashlib.sha1(head).hexdigest(), len(head)
+
+def file_key(stat):
+    return f"{stat.st_dev}:{stat.st_ino}"
+
+class CheckpointStore:
+    """Where each log file was last read up to, so a run only reads the bytes added since.
+
+    Entries are keyed by device and inode and hold the byte offset, the line count and a
+    fingerprint of the file's head, so the state stays one entry per file. A new file at
+    the old path (rotation), a truncated file or a reused inode starts again from 0; what
+    was left unread in a file rotated away is not read. Each script should use a file of
+    its own - entries are per file, not per reader, so a shared one skips lines.
+    """
+
+    def __init__(self, path, entries=None):
+        """path=None keeps the store in memory only, e.g. a worker's copy of a few entries."""
+        self.path = path
+        self.entries = dict(entries or {})
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"WARNING: ignoring unreadable checkpoint file {path}: {e}")
+
+    def save(self):
+        """Writes the checkpoints atomically, dropping files that are gone."""
+        live = {}
+        for key, entry in self.entries.items():
+            try:
+                if file_key(os.stat(entry["path"])) == key:
+                    live[key] = entry
+            except OSError:
+                pass
+        self.entries = live
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+    def entries_for(self, path):
+        """{key: entry} for the file now at `path`, to hand to a worker process."""
+        try:
+            key = file_key(os.stat(path))
+        except OSError:
+            return {}
+        return {key: self.entries[key]} if key in self.entries else {}
+
+    def resume_point(self, f):
+        """(byte offset, lines already read) to continue an open binary file from."""
+        stat = os.fstat(f.fileno())
+        entry = self.entries.get(file_key(stat))
+        if entry is None or stat.st_size < entry["offset"]:
+            return 0, 0  # never seen, or truncated in place (copytruncate)
+        if head_fingerprint(f, entry["head_length"])[0] != entry["head"]:
+            return 0, 0  # same inode, different file
+        return entry["offset"], entry["lines"]
+
+    def commit(self, path, f, offset, lines):
+        head, head_length = head_fingerprint(f)
+        self.entries[file_key(os.fstat(f.fileno()))] = {
+            "path": path, "offset": offset, "lines": lines, "head": head, "head_length": head_length}
+
+    def read_new_lines(self, path, encoding="utf-8", needles=None):
+        """Yields (line_number, line) for each complete line added since the last run.
+
+        With needles, only lines containing one of them are decoded and yielded (see
+        LogReader). A trailing line without its newline yet is left for the next run. The
+        checkpoint moves only once the generator is exhausted; call save() to persist it.
+        """
+        path = os.path.abspath(path)
+        with open(path, "rb") as f:
+            offset, line_number = self.resume_point(f)
+            reader = LogReader(f, needles, encoding=encoding)
+            yield from reader.lines(offset, line_number, include_partial=False)
+            self.commit(path, f, reader.offset, reader.line_number)
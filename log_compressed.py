@@ -0,0 +1,113 @@
+import os
+import re
+import bz2
+import gzip
+import json
+import lzma
+import hashlib
+
+COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+ARCHIVE_CACHE_FILE = "log_archive_cache.json"
+FINGERPRINT_BYTES = 4096  # hashed from each end; gzip/bz2/xz trailers carry a checksum of the content
+# What logrotate & co. put between the log name and the compression suffix: .1, -20240101, .2024-01-01
+ROTATION_SUFFIX = re.compile(r"(?:[.\-_](?:\d+|\d{4}-?\d{2}-?\d{2}(?:[-_T]?\d{2,6})?))+$")
+
+def compression(path):
+    """'.gz', '.bz2' or '.xz' for a compressed file, else None."""
+    for suffix in COMPRESSED_OPENERS:
+        if str(path).endswith(suffix):
+            return suffix
+    return None
+
+def is_log_file(path, extensions):
+    """A live log (name ends in one of extensions) or a compressed rotation of one (app.log.1.gz)."""
+    name = os.path.basename(str(path))
+    suffix = compression(name)
+    if suffix is None:
+        return name.endswith(tuple(extensions))
+    stem = name[:-len(suffix)]
+    return stem.endswith(tuple(extensions)) or ROTATION_SUFFIX.sub("", stem).endswith(tuple(extensions))
+
+def open_log(path):
+    """Binary file object of the log's text; compressed files are decompressed as they're read."""
+    opener = COMPRESSED_OPENERS.get(compression(path))
+    return opener(path, "rb") if opener else open(path, "rb")
+
+def archive_fingerprint(path):
+    """Identity of a compressed file's content: its size and a hash of both ends."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        digest = hashlib.sha1(f.read(FINGERPRINT_BYTES))
+        if size > FINGERPRINT_BYTES:
+            f.seek(max(FINGERPRINT_BYTES, size - FINGERPRINT_BYTES))
+            digest.update(f.read())
+    return f"{size}:{digest.hexdigest()}"
+
+class ArchiveCache:
+    """Scan results of compressed rotations, keyed by content fingerprint.
+
+    A .gz/.bz2/.xz rotation doesn't change once written, so its result is kept after the
+    first scan and reused on later runs - also after it is renamed again (app.log.1.gz ->
+    app.log.2.gz) - without decompressing it. Results must be JSON-serialisable. save()
+    keeps only the entries looked up or stored this run, so rotations deleted from disk
+    drop out of the file.
+
+    signature describes what the results depend on (patterns, keywords); a cache written
+    with a different one is discarded. Each script should use a file of its own.
+    """
+
+    def __init__(self, path=ARCHIVE_CACHE_FILE, signature=""):
+        self.path = path
+        self.signature = signature
+        self.entries = {}
+        self.used = {}
+        self.fingerprints = {}  # path -> fingerprint, so a file is hashed once per run
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("signature") == signature:
+                    self.entries = data["entries"]
+            except (OSError, ValueError, KeyError, AttributeError) as e:
+                print(f"WARNING: ignoring unreadable archive cache {path}: {e}")
+
+    def _fingerprint(self, path):
+        if path not in self.fingerprints:
+            self.fingerprints[path] = archive_fingerprint(path)
+        return self.fingerprints[path]
+
+    def get(self, path):
+        """The stored result for this file's content, or None."""
+        try:
+            key = self._fingerprint(path)
+        except OSError:
+            return None
+        if key in self.entries:
+            self.used[key] = self.entries[key]
+            return self.entries[key]
+        return None
+
+    def put(self, path, result):
+        try:
+            key = self._fingerprint(path)
+        except OSError:
+            return
+        self.entries[key] = self.used[key] = result
+
+    def split(self, paths):
+        """(files to scan, {path: cached result}); only compressed files are ever cached."""
+        to_scan, cached = [], {}
+        for path in paths:
+            result = self.get(path) if compression(path) else None
+            if result is None:
+                to_scan.append(path)
+            else:
+                cached[path] = result
+        return to_scan, cached
+
+    def save(self):
+        self.entries = self.used
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"signature": self.signature, "entries": self.entries}, f)
+        os.replace(tmp, self.path)
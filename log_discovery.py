@@ -0,0 +1,98 @@
+import os
+import json
+import time
+from fnmatch import fnmatch
+from log_compressed import compression, is_log_file
+
+EXCLUDE_DIRS = [".git", ".svn", "__pycache__", "node_modules"]  # names or globs never descended into
+MTIME_SLACK = 2  # seconds; a directory changed this recently is listed again next time (mtime granularity)
+
+class DirectoryCache:
+    """What each directory held last time, keyed by its mtime.
+
+    Creating, deleting or renaming an entry changes a directory's mtime; writing to a file
+    inside it doesn't. So while the mtime is the same, the directory's matching files and
+    subdirectories are still what was recorded and it needn't be listed again - only its
+    subdirectories are stat()ed to check them in turn.
+    """
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        self.entries = {}
+        self.seen = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("signature") == signature:
+                    self.entries = data["entries"]
+            except (OSError, ValueError, KeyError, AttributeError) as e:
+                print(f"WARNING: ignoring unreadable discovery cache {path}: {e}")
+
+    def get(self, directory, mtime):
+        """(file names, subdirectory names) recorded for directory at this mtime, or None."""
+        entry = self.entries.get(directory)
+        if entry is None or entry["mtime"] != mtime:
+            return None
+        self.seen[directory] = entry
+        return entry["files"], entry["dirs"]
+
+    def put(self, directory, mtime, files, dirs):
+        if time.time_ns() - mtime > MTIME_SLACK * 1_000_000_000:
+            self.seen[directory] = {"mtime": mtime, "files": files, "dirs": dirs}
+
+    def save(self):
+        """Writes the directories seen this run; ones that are gone drop out."""
+        self.entries = self.seen
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"signature": self.signature, "entries": self.entries}, f)
+        os.replace(tmp, self.path)
+
+def _list_directory(directory, extensions, exclude, compressed):
+    files, dirs = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # like find -type f/-type d: symlinks are neither followed nor listed
+            if entry.is_dir(follow_symlinks=False):
+                if not any(fnmatch(entry.name, pattern) for pattern in exclude):
+                    dirs.append(entry.name)
+            elif entry.is_file(follow_symlinks=False) and is_log_file(entry.name, extensions):
+                if compressed or not compression(entry.name):
+                    files.append(entry.name)
+    return files, dirs
+
+def find_log_files(root, extensions, exclude=EXCLUDE_DIRS, compressed=True, recursive=True, cache_file=None):
+    """Paths of log files under root in a single os.scandir() walk - no find/ls subprocesses.
+
+    extensions: name endings such as '.log' or 'nohup_log'. compressed=True also returns
+    their .gz/.bz2/.xz rotations (see log_compressed.is_log_file). Directories whose name
+    matches an exclude pattern are pruned, not walked and filtered afterwards. With
+    cache_file, directories unchanged since the last run are not listed again (see
+    DirectoryCache).
+    """
+    cache = None
+    if cache_file:
+        cache = DirectoryCache(cache_file, repr((sorted(extensions), sorted(exclude), compressed)))
+    found = []
+    stack = [os.path.abspath(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            listing = cache.get(directory, mtime) if cache else None
+            if listing is None:
+                listing = _list_directory(directory, extensions, exclude, compressed)
+                if cache:
+                    cache.put(directory, mtime, *listing)
+        except OSError as e:
+            print(f"[WARN] Skipping {directory}: {e}")
+            continue
+        files, dirs = listing
+        found.extend(os.path.join(directory, name) for name in files)
+        if recursive:
+            stack.extend(os.path.join(directory, name) for name in reversed(dirs))
+    if cache:
+        cache.save()
+    return found
@@ -0,0 +1,75 @@
+import re
+import heapq
+import hashlib
+from collections import OrderedDict
+
+MAX_TEMPLATES = 10000  # templates tracked at once; the least recently seen one goes first
+TOP_N = 50
+
+# Variable parts of a message, tried left to right at each position - one pass over the line
+MASK_PATTERN = re.compile(r"""
+    (?P<uuid>\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b)
+  | (?P<ip>\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b)
+  | (?P<path>(?:\b[A-Za-z]:)?(?:[\\/][\w.\-]+){2,}[\\/]?)
+  | (?P<hex>\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{8,}\b)
+  | (?P<num>(?<![A-Za-z\d])\d+(?:[.,]\d+)*)
+""", re.VERBOSE)
+SPACES = re.compile(r"\s+")
+
+def template(message):
+    """The message with UUIDs, IPs, paths, hex ids and numbers replaced by <uuid>, <ip>, ... ."""
+    masked = MASK_PATTERN.sub(lambda match: f"<{match.lastgroup}>", message)
+    return SPACES.sub(" ", masked).strip()
+
+def fingerprint(text):
+    """Short stable hash of a template, the same across runs and processes."""
+    return hashlib.blake2b(text.encode("utf-8", "replace"), digest_size=8).hexdigest()
+
+class TemplateCounter:
+    """Message counts per template in an LRU-bounded table.
+
+    add() masks a message, hashes the template and bumps its count, so thousands of errors
+    that differ only in ids, timestamps or addresses end up as one entry with one example.
+    At most max_templates are held; a new template past that evicts the one seen least
+    recently (its count is lost and added to `evicted`), so memory stays flat on any log.
+    Tables from worker processes are combined with update().
+    """
+
+    def __init__(self, max_templates=MAX_TEMPLATES):
+        self.max_templates = max_templates
+        self.table = OrderedDict()  # fingerprint -> [count, template, example]
+        self.evicted = 0
+
+    def add(self, message, example=None, count=1):
+        """Counts a message; example (e.g. 'file:line') is kept for the template's first one."""
+        text = template(message)
+        return self._count(fingerprint(text), text, example or message.strip(), count)
+
+    def _count(self, key, text, example, count):
+        entry = self.table.get(key)
+        if entry is None:
+            if len(self.table) >= self.max_templates:
+                _, (lost, _, _) = self.table.popitem(last=False)
+                self.evicted += lost
+            self.table[key] = [count, text, example]
+        else:
+            entry[0] += count
+            self.table.move_to_end(key)
+        return key
+
+    def update(self, other):
+        for key, (count, text, example) in other.table.items():
+            self._count(key, text, example, count)
+        self.evicted += other.evicted
+
+    def top(self, n=TOP_N):
+        """[(count, fingerprint, template, example)] of the n most frequent templates."""
+        return heapq.nlargest(n, ((entry[0], key, entry[1], entry[2]) for key, entry in self.table.items()))
+
+    def save_top(self, path, n=TOP_N):
+        """Writes the n most frequent templates to path; one file per script."""
+        with open(path, "w") as f:
+            for count, key, text, example in self.top(n):
+                f.write(f"{count}\t{key}\t{text}\n\texample: {example}\n")
+            if self.evicted:
+                f.write(f"# {self.evicted} occurrences of evicted templates not counted above\n")
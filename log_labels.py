@@ -0,0 +1,128 @@
+import json
+import os
+import random
+import threading
+from prometheus_client.core import GaugeMetricFamily
+
+FIELDS = ("app", "env", "folder", "file", "type", "keyword")  # the only labels an occurrence series gets
+ROLLUP_ORDER = ("keyword", "file", "folder")  # fields folded into OTHER, in turn, once the budget is spent
+OTHER = "_other"
+MAX_SERIES = 5000      # distinct series per table before new ones are rolled up or dropped
+ROLLUP_RESERVE = 0.1   # extra share of MAX_SERIES roll-up series may take
+SAMPLES_PER_KEY = 5    # line numbers / messages kept per series
+
+class SeriesBudget:
+    """Caps how many distinct label sets get through.
+
+    Keys under max_series pass as they are. Past it, with rollup=True, a new key has its
+    ROLLUP_ORDER fields replaced by OTHER one at a time - keyword first, so the file
+    still shows up with its count - and gets the first roll-up that already exists or
+    fits in the reserve. The last roll-up (only app, env and type left) always gets in,
+    so nothing is lost from the totals. With rollup=False new keys are dropped.
+    """
+
+    def __init__(self, max_series=MAX_SERIES, rollup=True, fields=FIELDS):
+        self.max_series = max_series
+        self.rollup = rollup
+        self.limit = max_series + int(max_series * ROLLUP_RESERVE)
+        self.positions = [fields.index(field) for field in ROLLUP_ORDER]
+        self.keys = set()
+        self.rolled_up = 0
+        self.dropped = 0
+
+    def admit(self, key):
+        """key itself, the roll-up it is counted under, or None if it is dropped."""
+        if key in self.keys:
+            return key
+        if len(self.keys) < self.max_series:
+            self.keys.add(key)
+            return key
+        if not self.rollup:
+            self.dropped += 1
+            return None
+        self.rolled_up += 1
+        rolled = list(key)
+        for step, position in enumerate(self.positions, 1):
+            rolled[position] = OTHER
+            candidate = tuple(rolled)
+            if candidate in self.keys or len(self.keys) < self.limit or step == len(self.positions):
+                self.keys.add(candidate)
+                return candidate
+
+class OccurrenceTable:
+    """Keyword occurrence counts per (app, env, folder, file, type, keyword), with samples beside them.
+
+    Line numbers and messages are never labels - every distinct value was a new series.
+    Instead up to samples_per_key of them are kept per series as a reservoir sample
+    (uniform over all occurrences seen, constant memory) and written to a JSON file with
+    save_samples(). The number of series is bounded by a SeriesBudget.
+
+    The table is a collector: register it in a CollectorRegistry and it is pushed as one
+    gauge, `name`, with labelnames standing in for FIELDS (a script's existing label
+    names can be kept). add() may be called from another thread than collect()/save_samples().
+    """
+
+    def __init__(self, name, documentation, app, env, labelnames=FIELDS, max_series=MAX_SERIES,
+                 rollup=True, samples_per_key=SAMPLES_PER_KEY, seed=0):
+        self.name = name
+        self.documentation = documentation
+        self.app = app
+        self.env = env
+        self.labelnames = list(labelnames)
+        self.budget = SeriesBudget(max_series, rollup)
+        self.samples_per_key = samples_per_key
+        self.random = random.Random(seed)
+        self.counts = {}
+        self.seen = {}     # key -> samples offered
+        self.samples = {}  # key -> [sample]
+        self.lock = threading.Lock()
+
+    def add(self, folder, file, keyword_type, keyword, count=1, samples=()):
+        """Counts occurrences; samples are (line_number, message) pairs, either may be None.
+
+        Returns the series key the count went to, None if it was dropped.
+        """
+        original = (self.app, self.env, folder, file, keyword_type, keyword)
+        with self.lock:
+            key = self.budget.admit(original)
+            if key is None:
+                return None
+            self.counts[key] = self.counts.get(key, 0) + count
+            for line_number, message in samples:
+                sample = {"line": line_number, "message": message}
+                if key != original:
+                    sample.update(folder=folder, file=file, keyword=keyword)  # what was rolled up
+                self._offer(key, sample)
+        return key
+
+    def _offer(self, key, sample):
+        """Reservoir sampling (Algorithm R) of one series' occurrences."""
+        seen = self.seen.get(key, 0) + 1
+        self.seen[key] = seen
+        samples = self.samples.setdefault(key, [])
+        if len(samples) < self.samples_per_key:
+            samples.append(sample)
+        else:
+            slot = self.random.randrange(seen)
+            if slot < self.samples_per_key:
+                samples[slot] = sample
+
+    def collect(self):
+        family = GaugeMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        with self.lock:
+            for key, count in self.counts.items():
+                family.add_metric(list(key), count)
+        yield family
+
+    def save_samples(self, path):
+        """Writes {series labels, count, samples} per series, atomically; one file per script."""
+        with self.lock:
+            entries = [dict(zip(FIELDS, key), count=self.counts[key], samples=list(samples))
+                       for key, samples in self.samples.items()]
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp, path)
+        if self.budget.rolled_up or self.budget.dropped:
+            print(f"[WARN] Series budget of {self.budget.max_series} reached for {self.name}: "
+                  f"{self.budget.rolled_up} occurrences rolled up, {self.budget.dropped} dropped")
@@ -0,0 +1,100 @@
+import re
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+def as_pattern(pattern):
+    return pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, re.IGNORECASE)
+
+def _shortest(options):
+    return min(map(len, options))
+
+def _literal_options(items):
+    """Lower-cased strings one of which every match of this parsed sequence contains, or None."""
+    best = None
+    run = []
+
+    def consider(options):
+        nonlocal best
+        if options and all(options) and (best is None or _shortest(options) > _shortest(best)):
+            best = options
+
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        consider({''.join(run).lower()} if run else None)
+        run = []
+        if op is sre_parse.SUBPATTERN:
+            consider(_literal_options(av[-1]))
+        elif op is sre_parse.BRANCH:
+            branches = [_literal_options(branch) for branch in av[1]]
+            if all(branches):
+                consider(set().union(*branches))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            consider(_literal_options(av[2]))
+    consider({''.join(run).lower()} if run else None)
+    return best
+
+def required_literals(pattern):
+    """Tuple of strings, one of which is in line.lower() whenever the pattern matches the line.
+
+    None when the pattern has no such literal (e.g. r'\\d+'); it then has to be run on every line.
+    """
+    options = _literal_options(sre_parse.parse(pattern.pattern, pattern.flags))
+    return tuple(sorted(options)) if options else None
+
+class LineMatcher:
+    """The patterns and keywords of a scanner behind one cheap literal prefilter.
+
+    Every built-in pattern here needs some fixed word to match ('Error', 'Exception',
+    'fatal', ...). Those words are pulled out of the compiled patterns once, and a line is
+    lower-cased once and checked for them with plain substring tests; a regex only runs on
+    a line that contains one of its words. Most log lines contain none of them and cost one
+    lower() plus a few `in` tests, and the results are exactly those of running every
+    pattern and keyword separately.
+
+    patterns: {name: regex} - strings are compiled case-insensitive, compiled ones keep their flags
+    keywords: plain strings, found case-insensitively anywhere in the line
+    """
+
+    def __init__(self, patterns=None, keywords=()):
+        self.patterns = [(name, pattern, required_literals(pattern))
+                         for name, pattern in ((name, as_pattern(p)) for name, p in (patterns or {}).items())]
+        self.keywords = [(keyword, keyword.lower()) for keyword in keywords]
+
+    def prefilter_words(self):
+        """Every word a matching line must contain, for LogReader; None if some pattern has none."""
+        words = {lowered_keyword for _, lowered_keyword in self.keywords}
+        for _, _, literals in self.patterns:
+            if literals is None:
+                return None
+            words.update(literals)
+        return sorted(words)
+
+    def _candidates(self, lowered):
+        for name, pattern, literals in self.patterns:
+            if literals is None or any(literal in lowered for literal in literals):
+                yield name, pattern
+
+    def scan(self, line):
+        """({pattern name: text of its first match}, [keywords present]) for one line."""
+        lowered = line.lower()
+        found = {}
+        for name, pattern in self._candidates(lowered):
+            match = pattern.search(line)
+            if match:
+                found[name] = match.group()
+        keywords = [keyword for keyword, lowered_keyword in self.keywords if lowered_keyword in lowered]
+        return found, keywords
+
+    def findall(self, line):
+        """{pattern name: [every match]} for one line, as a findall() per pattern would give."""
+        found = {}
+        for name, pattern in self._candidates(line.lower()):
+            matches = pattern.findall(line)
+            if matches:
+                found[name] = matches
+        return found
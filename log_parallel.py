@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from log_compressed import compression
+
+SPLIT_SIZE = 64 * 1024 * 1024  # files bigger than this are scanned as several byte ranges
+TASKS_PER_WORKER = 4           # ranges handed to a worker at a time
+
+def plan_ranges(paths, split_size=SPLIT_SIZE):
+    """(path, start, end) tasks; end is None for the last range of a file.
+
+    Boundaries are raw byte offsets - the worker moves them to line starts with
+    log_reader.line_start(), so every line lands in exactly one range. A compressed file
+    is always one range: it can only be read from the start.
+    """
+    for path in paths:
+        if compression(path):
+            yield path, 0, None
+            continue
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0  # let the worker report it
+        starts = list(range(0, size, split_size)) or [0]
+        for start, end in zip(starts, starts[1:] + [None]):
+            yield path, start, end
+
+def _run(task):
+    scan_range, path, start, end = task
+    return scan_range(path, start, end)
+
+def scan_in_parallel(paths, scan_range, workers=None, split_size=SPLIT_SIZE):
+    """Runs scan_range over every file across a process pool; yields (path, parts) per file.
+
+    scan_range(path, start, end) must be a module-level function (it is pickled to the
+    workers) returning (part, line_count) for the lines starting in [start, end), with
+    line numbers inside `part` counted from the start of the range. Files come back in
+    the order given and their parts in file order, so first-line offsets can be rebuilt
+    with with_line_offsets().
+    """
+    tasks = [(scan_range, path, start, end) for path, start, end in plan_ranges(paths, split_size)]
+    if not tasks:
+        return
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(tasks) // (workers * TASKS_PER_WORKER)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = zip(tasks, executor.map(_run, tasks, chunksize=chunksize))
+        for path, group in groupby(results, key=lambda item: item[0][1]):
+            yield path, [result for _, result in group]
+
+def map_in_parallel(function, arguments, workers=None):
+    """function(*args) for each tuple in arguments across a process pool; results in order."""
+    arguments = list(arguments)
+    if not arguments:
+        return
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(arguments) // (workers * TASKS_PER_WORKER)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(function, *zip(*arguments), chunksize=chunksize)
+
+def with_line_offsets(parts):
+    """(part, lines before it in the file) for each (part, line_count) of one file."""
+    offset = 0
+    for part, line_count in parts:
+        yield part, offset
+        offset += line_count
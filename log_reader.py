@@ -0,0 +1,104 @@
+CHUNK_SIZE = 4 * 1024 * 1024  # bytes read per call; memory stays around this plus the longest line
+
+def line_start(f, position, chunk_size=64 * 1024):
+    """Offset of the first line starting at or after `position` in a binary file (EOF if none).
+
+    Byte ranges cut at line_start() boundaries split a file into whole lines, each line
+    going to the range it starts in.
+    """
+    if position <= 0:
+        return 0
+    offset = position - 1
+    f.seek(offset)
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            return offset
+        newline = data.find(b"\n")
+        if newline != -1:
+            return offset + newline + 1
+        offset += len(data)
+
+class LogReader:
+    """Reads a binary log in large chunks and only decodes lines that contain a needle.
+
+    Each chunk is lower-cased as bytes and searched with bytes.find() for the needles
+    (e.g. LineMatcher.prefilter_words()); only the lines around a hit are split out and
+    decoded. Line numbers are still exact, counted with bytes.count() over what is skipped.
+    needles=None turns the prefilter off and every line is yielded. Case folding is ASCII,
+    so non-ASCII needles also turn the prefilter off.
+
+    After lines() is exhausted, `offset` is the byte offset just past the last line read
+    and `line_number` the number of lines up to there.
+    """
+
+    def __init__(self, f, needles=None, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.needles = None
+        if needles is not None and all(needle.isascii() and needle for needle in needles):
+            needles = {needle.lower().encode() for needle in needles}
+            # 'error:' can't be found where 'error' isn't, so only the shorter one is searched for
+            self.needles = sorted(needle for needle in needles
+                                  if not any(other != needle and other in needle for other in needles))
+        self.offset = 0
+        self.line_number = 0
+
+    def lines(self, start=0, line_number=0, include_partial=True, end=None):
+        """Yields (line_number, line) from byte `start` on.
+
+        include_partial=False leaves a last line without its newline for next time, the
+        way a checkpointed reader wants it. With `end`, reading stops after the line that
+        holds byte end - 1; `start` should then be a line_start() boundary.
+        """
+        self.f.seek(start)
+        self.offset = start
+        self.line_number = line_number
+        if end is not None and start >= end:
+            return
+        carry = b""
+        while True:
+            data = self.f.read(self.chunk_size)
+            chunk = carry + data
+            if not data:
+                if chunk and include_partial:
+                    yield from self._chunk_lines(chunk + b"\n")
+                    self.offset -= 1  # the newline added above isn't in the file
+                return
+            if end is not None and self.offset + len(chunk) >= end:
+                stop = chunk.find(b"\n", max(end - 1 - self.offset, 0)) + 1
+                if stop:
+                    yield from self._chunk_lines(chunk[:stop])
+                    return
+            cut = chunk.rfind(b"\n") + 1
+            carry = chunk[cut:]
+            if cut:
+                yield from self._chunk_lines(chunk[:cut])
+
+    def _chunk_lines(self, chunk):
+        """Lines of a newline-terminated chunk; advances offset and line_number past it."""
+        base_line = self.line_number
+        self.offset += len(chunk)
+        self.line_number += chunk.count(b"\n")
+
+        if self.needles is None:
+            for i, raw in enumerate(chunk.split(b"\n")[:-1], base_line + 1):
+                yield i, raw.decode(self.encoding, errors="ignore") + "\n"
+            return
+
+        lowered = chunk.lower()
+        starts = set()
+        for needle in self.needles:
+            position = lowered.find(needle)
+            while position != -1:
+                starts.add(lowered.rfind(b"\n", 0, position) + 1)
+                # carry on from the next line; the chunk ends in a newline so there always is one
+                position = lowered.find(needle, lowered.find(b"\n", position) + 1)
+
+        line_number, counted_to = base_line, 0
+        for line_start in sorted(starts):
+            line_number += chunk.count(b"\n", counted_to, line_start) + 1
+            line_end = chunk.find(b"\n", line_start) + 1
+            counted_to = line_end
+            yield line_number, chunk[line_start:line_end].decode(self.encoding, errors="ignore")
@@ -0,0 +1,231 @@
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from log_checkpoint import file_key
+from log_reader import LogReader
+
+POLL_INTERVAL = 1.0   # seconds between stat() sweeps of files nothing is watching
+RETIRED_MAX = 256     # replaced files remembered until a rename shows where they went
+RESCAN_INTERVAL = 30  # seconds between full sweeps with inotify, in case an event was missed
+
+# inotify(7) constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CREATE | IN_MOVED_TO | IN_DELETE
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len - then len bytes of name
+
+class Inotify:
+    """Just enough of inotify through ctypes: directory watches and reading their events."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            error = ctypes.get_errno()  # ENOSPC once fs.inotify.max_user_watches is used up
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def read_events(self, timeout):
+        """[(wd, mask, cookie, name)] pending now or arriving within timeout seconds."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        position = 0
+        while position < len(data):
+            wd, mask, cookie, length = EVENT.unpack_from(data, position)
+            position += EVENT.size
+            name = os.fsdecode(data[position:position + length].rstrip(b"\0"))
+            position += length
+            events.append((wd, mask, cookie, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class LogTailer:
+    """Follows many log files from one thread, the way `tail -F` follows one.
+
+    on_line(path, line_number, line) is called for every complete line appended to a
+    followed file. With needles only lines containing one of them are passed on (see
+    LogReader); line numbers are exact either way, counted from where following began.
+
+    Files are not kept open: a file that changed is opened, read from its offset to the
+    end and closed again, so thousands of files cost this thread and one inotify
+    descriptor. On Linux each file's directory is watched through inotify; without
+    inotify, or for a directory past the watch limit, files are stat()ed every
+    poll_interval instead. A new file at a followed path (rotation) is followed from its
+    start, and with inotify the rest of the file renamed away (app.log -> app.log.1)
+    is still read under its new name and reported under the old one; polling only
+    notices the new file. A truncated file is read again from 0.
+    """
+
+    def __init__(self, on_line, needles=None, poll_interval=POLL_INTERVAL, use_inotify=True):
+        self.on_line = on_line
+        self.needles = needles
+        self.poll_interval = poll_interval
+        self.files = {}    # path -> {"key": dev:ino or None, "offset": bytes read, "lines": lines read}
+        self.polled = set()
+        self.watches = {}  # wd -> directory
+        self.directories = {}  # directory -> wd, None if it can't be watched
+        self.retired = {}  # dev:ino -> (path, state) of a file that was replaced at its path
+        self.stopped = threading.Event()
+        self.inotify = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError) as e:
+                print(f"[WARN] inotify unavailable, polling log files instead: {e}")
+
+    def add(self, path, from_end=True, resume=None):
+        """Starts following path; from_end=False also reads what is already in it.
+
+        resume=(dev:ino, byte offset, lines) continues where an earlier read of the file
+        stopped (a historical pass); if path holds another file by now, that one is read from 0.
+        """
+        path = os.path.abspath(path)
+        if resume is not None:
+            key, offset, lines = resume
+            self.files[path] = {"key": key, "offset": offset, "lines": lines}
+        else:
+            try:
+                stat = os.stat(path)
+                self.files[path] = {"key": file_key(stat), "offset": stat.st_size if from_end else 0, "lines": 0}
+            except OSError:
+                self.files[path] = {"key": None, "offset": 0, "lines": 0}  # read once it appears
+        if self._watch(os.path.dirname(path)) is None:
+            self.polled.add(path)
+
+    def _watch(self, directory):
+        if directory not in self.directories:
+            wd = None
+            if self.inotify:
+                try:
+                    wd = self.inotify.add_watch(directory)
+                    self.watches[wd] = directory
+                except OSError as e:
+                    print(f"[WARN] Can't watch {directory}, polling its files: {e}")
+            self.directories[directory] = wd
+        return self.directories[directory]
+
+    def _check(self, path):
+        """Reads whatever was appended to path since the last check."""
+        state = self.files[path]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return  # gone for now (mid-rotation); picked up when it reappears
+        key = file_key(stat)
+        if key != state["key"]:
+            if state["key"] is not None:
+                self.retired[state["key"]] = (path, dict(state))
+                if len(self.retired) > RETIRED_MAX:
+                    del self.retired[next(iter(self.retired))]
+            state.update(key=key, offset=0, lines=0)  # a new file at this path
+        elif stat.st_size < state["offset"]:
+            state.update(offset=0, lines=0)  # truncated in place
+        elif stat.st_size == state["offset"]:
+            return
+        self._read(path, state)
+
+    def _read(self, path, state, source=None):
+        """Passes on the lines of source (path by default) past state's offset, then moves it."""
+        try:
+            with open(source or path, "rb") as f:
+                if file_key(os.fstat(f.fileno())) != state["key"]:
+                    return  # replaced between stat() and open(); the next check sees the new one
+                reader = LogReader(f, self.needles)
+                for line_number, line in reader.lines(state["offset"], state["lines"], include_partial=False):
+                    self.on_line(path, line_number, line)
+                state["offset"], state["lines"] = reader.offset, reader.line_number
+        except OSError as e:
+            print(f"[ERROR] Could not read {source or path}: {e}")
+
+    def _moved_to(self, path):
+        """Reads the rest of a followed file that was just renamed to path."""
+        try:
+            key = file_key(os.stat(path))
+        except OSError:
+            return
+        # by the time the event is handled the old path may already hold its successor
+        if key in self.retired:
+            old_path, state = self.retired.pop(key)
+        else:
+            old_path = next((p for p, s in self.files.items() if s["key"] == key and p != path), None)
+            if old_path is None:
+                return
+            state = dict(self.files[old_path])
+        self._read(old_path, state, source=path)
+        if self.files.get(old_path, {}).get("key") == key:
+            self.files[old_path].update(state)
+
+    def _handle(self, events):
+        for wd, mask, cookie, name in events:
+            if mask & IN_Q_OVERFLOW:
+                self._sweep(self.files)  # events were dropped
+                continue
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_MOVED_TO:
+                # finish the rotated file under its new name before following the new one
+                self._moved_to(path)
+            if path in self.files:
+                self._check(path)
+
+    def _sweep(self, paths):
+        for path in list(paths):
+            try:
+                self._check(path)
+            except Exception as e:
+                print(f"[ERROR] Failed to follow {path}: {e}")
+
+    def run(self):
+        """Follows the files until stop(); call it from a thread of its own or as the main loop."""
+        last_sweep = None
+        while not self.stopped.is_set():
+            if self.inotify:
+                try:
+                    self._handle(self.inotify.read_events(self.poll_interval))
+                except Exception as e:
+                    print(f"[ERROR] Failed to handle file events: {e}")
+            else:
+                self.stopped.wait(self.poll_interval)
+            now = time.monotonic()
+            if self.inotify is None or last_sweep is None or now - last_sweep >= RESCAN_INTERVAL:
+                self._sweep(self.files)
+                last_sweep = now
+            else:
+                self._sweep(self.polled)
+        if self.inotify:
+            self.inotify.close()
+
+    def start(self):
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,179 @@
+import time
+import threading
+from prometheus_client import CollectorRegistry, push_to_gateway
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+PUSH_INTERVAL = 15    # seconds between consolidated pushes
+MAX_SERIES = 10000    # series held per buffer; new ones past this are dropped, not queued
+RETRIES = 2           # extra attempts per flush when a push fails
+BACKOFF = 1.0         # seconds before the first retry, doubled after each failure
+MAX_BACKOFF = 300     # longest wait between attempts while the Pushgateway keeps failing
+SERIES_TTL = 2 * 86400  # seconds a series is kept (and pushed) after its last update
+
+class _Snapshot:
+    """Collector over a fixed list of metric families, for one push."""
+
+    def __init__(self, families):
+        self.families = families
+
+    def collect(self):
+        return iter(self.families)
+
+class MetricsBuffer:
+    """Metric values kept in memory and pushed as one registry per job every interval.
+
+    push_metric() in the log scanners used to build a registry and push it for every
+    keyword/count pair - thousands of HTTP requests a minute on a busy log, each one
+    replacing the last in the job's group. Here inc()/set() only update a dict and a
+    flush pushes every series of a job in a single request.
+
+    Counters add up and gauges keep their last value across flushes, so each push carries
+    the job's full state. A job is only pushed again once something in it changed.
+    A series not updated for `ttl` seconds is expired at the next flush and left out of
+    its job's later pushes, so labels that move on (a date, a rotated file) don't pile up.
+    Backpressure: the buffer never holds more than max_series series. New series past
+    that are dropped and reported at the next flush, while series already held keep updating.
+    A failed push is retried `retries` times with doubling waits and the values stay
+    buffered. After that, flushes are skipped with a doubling backoff (up to MAX_BACKOFF)
+    until the Pushgateway is back.
+    """
+
+    def __init__(self, gateway_url, interval=PUSH_INTERVAL, max_series=MAX_SERIES,
+                 retries=RETRIES, backoff=BACKOFF, push=push_to_gateway, ttl=SERIES_TTL):
+        self.gateway_url = gateway_url
+        self.interval = interval
+        self.max_series = max_series
+        self.ttl = ttl
+        self.retries = retries
+        self.backoff = backoff
+        self.push = push
+        self.metrics = {}   # job -> {name: {"kind", "documentation", "labelnames", "values", "updated"}}, keyed by label values
+        self.dirty = set()  # jobs changed since their last successful push
+        self.series = 0
+        self.dropped = 0
+        self.expired_at = 0
+        self.failures = 0
+        self.retry_at = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def _update(self, job, name, documentation, labels, kind, value, add):
+        with self.lock:
+            metric = self.metrics.setdefault(job, {}).get(name)
+            if metric is None:
+                metric = self.metrics[job][name] = {
+                    "kind": kind, "documentation": documentation, "labelnames": list(labels), "values": {}, "updated": {}}
+            key = tuple(str(labels[label]) for label in metric["labelnames"])
+            values = metric["values"]
+            now = time.monotonic()
+            if key not in values:
+                if self.series >= self.max_series and self.ttl and now - self.expired_at >= self.interval:
+                    self._expire(now)  # make room from stale series before refusing new ones
+                if self.series >= self.max_series:
+                    self.dropped += 1
+                    return False
+                self.series += 1
+                values[key] = 0
+            values[key] = values[key] + value if add else value
+            metric["updated"][key] = now
+            self.dirty.add(job)
+            return True
+
+    def inc(self, job, name, documentation, labels, amount=1):
+        """Adds amount to a counter series; False if it was dropped because the buffer is full."""
+        return self._update(job, name, documentation, labels, "counter", amount, add=True)
+
+    def add(self, job, name, documentation, labels, amount=1):
+        """Adds amount to a gauge series (a running count that may also be set())."""
+        return self._update(job, name, documentation, labels, "gauge", amount, add=True)
+
+    def set(self, job, name, documentation, labels, value):
+        """Sets a gauge series; False if it was dropped because the buffer is full."""
+        return self._update(job, name, documentation, labels, "gauge", value, add=False)
+
+    def pending(self):
+        """How many jobs have changes that haven't been pushed yet (0 after a successful flush)."""
+        with self.lock:
+            return len(self.dirty)
+
+    def _expire(self, now):
+        """Drops series not updated within ttl; their jobs are pushed again without them."""
+        self.expired_at = now
+        expired = 0
+        for job, metrics in self.metrics.items():
+            for metric in metrics.values():
+                stale = [key for key, updated in metric["updated"].items() if now - updated > self.ttl]
+                for key in stale:
+                    del metric["values"][key]
+                    del metric["updated"][key]
+                if stale:
+                    expired += len(stale)
+                    self.dirty.add(job)
+        self.series -= expired
+        return expired
+
+    def _families(self, job):
+        families = []
+        for name, metric in self.metrics[job].items():
+            family_type = CounterMetricFamily if metric["kind"] == "counter" else GaugeMetricFamily
+            family = family_type(name, metric["documentation"], labels=metric["labelnames"])
+            for key, value in metric["values"].items():
+                family.add_metric(list(key), value)
+            families.append(family)
+        return families
+
+    def flush(self, force=False):
+        """Pushes every job changed since its last push; returns how many pushes succeeded."""
+        if not force and time.monotonic() < self.retry_at:
+            return 0
+        with self.lock:
+            expired = self._expire(time.monotonic()) if self.ttl else 0
+            pending = {job: self._families(job) for job in self.dirty}
+            self.dirty.clear()
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            print(f"[WARN] Metrics buffer full ({self.max_series} series), dropped {dropped} new series")
+        if expired:
+            print(f"[+] Expired {expired} series not updated in {self.ttl:.0f}s")
+
+        jobs = list(pending)
+        for pushed, job in enumerate(jobs):
+            if not self._push(job, pending[job]):
+                with self.lock:
+                    self.dirty.update(jobs[pushed:])  # values are still held; sent with a later flush
+                self.failures += 1
+                wait = min(MAX_BACKOFF, self.interval * 2 ** (self.failures - 1))
+                self.retry_at = time.monotonic() + wait
+                print(f"[WARN] Pushgateway unavailable, holding metrics and trying again in {wait:.0f}s")
+                return pushed
+        self.failures = 0
+        if jobs:
+            print(f"[+] Pushed {len(jobs)} job(s), {self.series} series held")
+        return len(jobs)
+
+    def _push(self, job, families):
+        registry = CollectorRegistry()
+        registry.register(_Snapshot(families))
+        for attempt in range(self.retries + 1):
+            try:
+                self.push(self.gateway_url, job=job, registry=registry)
+                return True
+            except Exception as e:
+                print(f"[ERROR] Push of job {job} failed (attempt {attempt + 1}/{self.retries + 1}): {e}")
+                if attempt < self.retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+        return False
+
+    def run(self):
+        """Flushes every interval until stop(), then once more."""
+        while not self.stopped.wait(self.interval):
+            self.flush()
+        self.flush(force=True)
+
+    def start(self):
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stopped.set()
@@ -1,8 +1,13 @@
+import os
 import re
-import subprocess
 import sys
+import time
 from datetime import datetime
-from prometheus_client import CollectorRegistry, Counter, push_to_gateway
+from log_matcher import LineMatcher
+from log_tail import LogTailer
+from metrics_buffer import MetricsBuffer
+from log_labels import OccurrenceTable
+from log_discovery import find_log_files
 
 # === CONFIGURATION ===
 LOG_DIR = "/var/log/myapp"  # Change this to your log path
@@ -10,111 +15,88 @@ PUSHGATEWAY_URL = "http://your.pushgateway.internal:9091"
 APP_NAME = "myapp"
 ENV = "prod"
 CUSTOM_KEYWORDS = ["timeout", "fatal", "unauthorized"]  # Customize this
+SAMPLES_FILE = "pt4_log_samples.json"  # a few line numbers / messages per series
 
 # === REGEX PATTERNS ===
 ERROR_PATTERN = re.compile(r"\b(\w+Error)\b", re.IGNORECASE)
 EXCEPTION_PATTERN = re.compile(r"\b(\w+Exception)\b", re.IGNORECASE)
 CUSTOM_PATTERN = re.compile("|".join(map(re.escape, CUSTOM_KEYWORDS)), re.IGNORECASE)
-
-
-def run_cmd(cmd):
-    """Run a shell command and return the output."""
-    return subprocess.check_output(cmd, text=True).strip()
+MATCHER = LineMatcher({"error": ERROR_PATTERN, "exception": EXCEPTION_PATTERN, "custom": CUSTOM_PATTERN})
+METRICS = MetricsBuffer(PUSHGATEWAY_URL)
+# Series budget and line-number samples (SAMPLES_FILE); line numbers aren't labels any more
+OCCURRENCES = OccurrenceTable('log_keyword_occurrence_total', 'Occurrences of keywords in log files', APP_NAME, ENV)
 
 
 def list_log_files(directory):
-    """List all *.log files using 'ls' via subprocess."""
-    result = subprocess.run(["ls", directory], stdout=subprocess.PIPE, text=True)
-    return [
-        f"{directory}/{line.strip()}"
-        for line in result.stdout.splitlines()
-        if line.strip().endswith(".log")
-    ]
+    """List all *.log files directly in directory (no ls subprocess)."""
+    return find_log_files(directory, [".log"], compressed=False, recursive=False)
 
 
 def get_basename(path):
-    return run_cmd(["basename", path])
+    return os.path.basename(path.rstrip("/")) or "/"
 
 
 def get_dirname(path):
-    return run_cmd(["dirname", path])
+    return os.path.dirname(path.rstrip("/") or "/") or "."
 
 
 def push_metric(keyword_type, keyword_value, count, file_path, line_number):
-    registry = CollectorRegistry()
-    metric = Counter(
-        'log_keyword_occurrence_total',
-        'Occurrences of keywords in log files',
-        [
-            'app_name', 'env', 'folder_name', 'file_name', 'date',
-            'keyword_type', 'keyword_value', 'line_number'
-        ],
-        registry=registry
-    )
-
+    """Buffer one occurrence; METRICS pushes everything buffered once per interval."""
     file_name = get_basename(file_path)
     folder_name = get_basename(get_dirname(file_path))
     date_str = datetime.now().strftime("%Y-%m-%d")
 
-    metric.labels(
-        app_name=APP_NAME,
-        env=ENV,
-        folder_name=folder_name,
-        file_name=file_name,
-        date=date_str,
-        keyword_type=keyword_type,
-        keyword_value=keyword_value,
-        line_number=str(line_number)
-    ).inc(count)
-
-    try:
-        push_to_gateway(PUSHGATEWAY_URL, job="log_monitor", registry=registry)
-    except Exception as e:
-        print(f"[ERROR] Failed to push metric: {e}")
+    # The line number becomes a sample; past the series budget the labels are rolled up
+    key = OCCURRENCES.add(folder_name, file_name, keyword_type, keyword_value, count, samples=[(line_number, None)])
+    if key is None:
+        return
+    app_name, env, folder_name, file_name, keyword_type, keyword_value = key
+
+    METRICS.inc("log_monitor", 'log_keyword_occurrence_total', 'Occurrences of keywords in log files', {
+        "app_name": app_name,
+        "env": env,
+        "folder_name": folder_name,
+        "file_name": file_name,
+        "date": date_str,
+        "keyword_type": keyword_type,
+        "keyword_value": keyword_value
+    }, count)
+
+
+def handle_line(file_path, line_number, line):
+    """Push error/exception/custom matches of one log line."""
+    for keyword_type, matches in MATCHER.findall(line).items():
+        for match in matches:
+            push_metric(keyword_type, match.lower() if keyword_type == "custom" else match, 1, file_path, line_number)
+
+
+def follow_log_files(files):
+    """Historical lines, then real-time ones, for all files from one tailer thread; this one pushes every interval."""
+    tailer = LogTailer(handle_line, needles=MATCHER.prefilter_words())
+    for file_path in files:
+        print(f"[*] Processing historical logs from {file_path}, then tailing it...")
+        # === Step 1 & 2: the tailer's first read covers the existing lines, later reads the new ones ===
+        tailer.add(file_path, from_end=False)
+    tailer.start()
+    while True:
+        time.sleep(METRICS.interval)
+        METRICS.flush()
+        OCCURRENCES.save_samples(SAMPLES_FILE)
 
 
 def monitor_log_file(file_path):
-    print(f"[*] Processing historical logs from {file_path}...")
-
-    # === Step 1: Process Historical Logs ===
-    try:
-        with open(file_path, "r") as f:
-            for line_number, line in enumerate(f, 1):
-                for match in ERROR_PATTERN.findall(line):
-                    push_metric("error", match, 1, file_path, line_number)
-                for match in EXCEPTION_PATTERN.findall(line):
-                    push_metric("exception", match, 1, file_path, line_number)
-                for match in CUSTOM_PATTERN.findall(line):
-                    push_metric("custom", match.lower(), 1, file_path, line_number)
-    except Exception as e:
-        print(f"[ERROR] Could not read file {file_path}: {e}")
-
-    print(f"[*] Now tailing real-time logs in {file_path}...")
-
-    # === Step 2: Tail Logs in Real-Time ===
-    proc = subprocess.Popen(["tail", "-F", file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    line_number = 0
-    for line in iter(proc.stdout.readline, ''):
-        line_number += 1
-        for match in ERROR_PATTERN.findall(line):
-            push_metric("error", match, 1, file_path, line_number)
-        for match in EXCEPTION_PATTERN.findall(line):
-            push_metric("exception", match, 1, file_path, line_number)
-        for match in CUSTOM_PATTERN.findall(line):
-            push_metric("custom", match.lower(), 1, file_path, line_number)
+    follow_log_files([file_path])
 
 
 def spawn_file_monitors():
-    """Launch a subprocess for each .log file in the directory."""
-    log_files = list_log_files(LOG_DIR)
-    for file_path in log_files:
-        subprocess.Popen(["python3", __file__, file_path])
+    """Follow every .log file in the directory."""
+    follow_log_files(list_log_files(LOG_DIR))
 
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        # Child mode: monitor one file
+        # Monitor one file
         monitor_log_file(sys.argv[1])
     else:
-        # Main mode: spawn subprocesses for each file
+        # Monitor every file in LOG_DIR
         spawn_file_monitors()
\ No newline at end of file
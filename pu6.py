@@ -1,10 +1,16 @@
+import os
 import re
 import time
-import subprocess
-import threading
 from datetime import datetime
-from collections import defaultdict, Counter
-from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+from collections import Counter
+from log_matcher import LineMatcher
+from log_reader import LogReader, line_start
+from log_checkpoint import file_key
+from log_parallel import scan_in_parallel
+from log_tail import LogTailer
+from metrics_buffer import MetricsBuffer
+from log_compressed import ArchiveCache, compression, open_log
+from log_discovery import find_log_files
 
 # === CONFIGURATION ===
 APP_NAME = "my_app"
@@ -12,110 +18,126 @@ ENV = "prod"
 CUSTOM_KEYWORDS = ["timeout", "connection refused", "failed to connect"]
 PUSHGATEWAY_URL = "http://your-push-gateway:9091"  # replace with your PushGateway URL
 PUSH_INTERVAL = 10  # seconds
+LOG_EXTENSIONS = [".log", ".out", ".err", "nohup_log"]
+ARCHIVE_CACHE_FILE = "pu6_archive_cache.json"  # counts of already-scanned .gz/.bz2/.xz rotations
+DISCOVERY_CACHE_FILE = "pu6_discovery_cache.json"  # directory listings, reused while a directory's mtime holds
 
 # === PATTERNS ===
 ERROR_PATTERN = re.compile(r"\b\w*Error\w*\b", re.IGNORECASE)
 EXCEPTION_PATTERN = re.compile(r"\b\w*Exception\w*\b", re.IGNORECASE)
 CUSTOM_PATTERN = re.compile("|".join(re.escape(kw) for kw in CUSTOM_KEYWORDS), re.IGNORECASE)
+MATCHER = LineMatcher({"error": ERROR_PATTERN, "exception": EXCEPTION_PATTERN, "custom": CUSTOM_PATTERN})
+METRICS = MetricsBuffer(PUSHGATEWAY_URL, interval=PUSH_INTERVAL)
 
-# === Push metrics to Prometheus PushGateway ===
-def push_metric(keyword_type, keyword_value, count, file_path, label_type="realtime"):
-    registry = CollectorRegistry()
-    g = Gauge(
-        'log_keyword_occurrences',
-        'Count of keyword occurrences in logs',
-        labelnames=["app_name", "env", "keyword_type", "keyword", "filename", "folder", "date", "mode"],
-        registry=registry
-    )
-
-    g.labels(
-        app_name=APP_NAME,
-        env=ENV,
-        keyword_type=keyword_type,
-        keyword=keyword_value,
-        filename=file_path.split("/")[-1],
-        folder="/".join(file_path.split("/")[:-1]),
-        date=datetime.now().strftime("%Y-%m-%d"),
-        mode=label_type
-    ).set(count)
+def count_line(counts, line):
+    """Adds every error/exception/custom match of one line to counts."""
+    for ktype, matches in MATCHER.findall(line).items():
+        for match in matches:
+            counts[ktype][match.lower() if ktype == "custom" else match] += 1
 
+# === Buffer metrics for the PushGateway (METRICS.flush() pushes them all at once) ===
+def push_metric(keyword_type, keyword_value, count, file_path, label_type="realtime"):
+    labels = {
+        "app_name": APP_NAME,
+        "env": ENV,
+        "keyword_type": keyword_type,
+        "keyword": keyword_value,
+        "filename": file_path.split("/")[-1],
+        "folder": "/".join(file_path.split("/")[:-1]),
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "mode": label_type
+    }
     job_name = f"{APP_NAME}_{ENV}_log_monitor"
-    try:
-        push_to_gateway(PUSHGATEWAY_URL, job=job_name, registry=registry)
-        print(f"[+] Pushed {keyword_type}: {keyword_value}={count} from {file_path}")
-    except Exception as e:
-        print(f"[ERROR] Failed to push metrics: {e}")
-
-# === Monitor a single log file ===
-def monitor_log_file(file_path):
-    print(f"[*] Processing historical logs from {file_path}...")
-
-    # HISTORICAL PROCESSING
-    hist_counts = {
+    # Historical counts are a file's totals; real-time ones keep adding up between pushes
+    update = METRICS.set if label_type == "historical" else METRICS.add
+    update(job_name, 'log_keyword_occurrences', 'Count of keyword occurrences in logs', labels, count)
+
+# === Historical counts for one byte range of a file (runs in a worker process) ===
+def count_range(file_path, start, end):
+    """((counts, (dev:ino, offset reached)), lines read); the last range of a live file hands the tailer its start."""
+    counts = {
         "error": Counter(),
         "exception": Counter(),
         "custom": Counter()
     }
-
     try:
-        with open(file_path, "r") as f:
-            for line in f:
-                for match in ERROR_PATTERN.findall(line):
-                    hist_counts["error"][match] += 1
-                for match in EXCEPTION_PATTERN.findall(line):
-                    hist_counts["exception"][match] += 1
-                for match in CUSTOM_PATTERN.findall(line):
-                    hist_counts["custom"][match.lower()] += 1
+        with open_log(file_path) as f:  # .gz/.bz2/.xz rotations are decompressed as they're read
+            compressed = compression(file_path)
+            key = None if compressed else file_key(os.fstat(f.fileno()))
+            reader = LogReader(f, MATCHER.prefilter_words())
+            # A live file's unfinished last line is left to the tailer, which reads it once complete
+            for _, line in reader.lines(line_start(f, start), end=end, include_partial=bool(compressed)):
+                count_line(counts, line)
+            return (counts, (key, reader.offset)), reader.line_number
     except Exception as e:
         print(f"[ERROR] Failed to read historical log: {e}")
-        return
-
-    # Push all historical counts at once
-    for ktype, keywords in hist_counts.items():
-        for keyword, count in keywords.items():
-            push_metric(ktype, keyword, count, file_path, label_type="historical")
+        return None, 0
 
-    print(f"[*] Finished historical read, now tailing {file_path} in real-time...")
-
-    # REAL-TIME TAILING
-    real_time_counts = {
+def push_historical(file_path, parts):
+    """Merges a file's range counts and pushes them; returns the merged counts, None if the file couldn't be read."""
+    hist_counts = {
         "error": Counter(),
         "exception": Counter(),
         "custom": Counter()
     }
-    last_push_time = time.time()
+    for part, _ in parts:
+        if part is None:
+            return None
+        counts, _ = part
+        for ktype, keywords in counts.items():
+            hist_counts[ktype].update(keywords)
 
-    proc = subprocess.Popen(["tail", "-F", file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    # Push all historical counts at once
+    for ktype, keywords in hist_counts.items():
+        for keyword, count in keywords.items():
+            push_metric(ktype, keyword, count, file_path, label_type="historical")
+    return hist_counts
 
-    for line in iter(proc.stdout.readline, ''):
-        for match in ERROR_PATTERN.findall(line):
-            real_time_counts["error"][match] += 1
-        for match in EXCEPTION_PATTERN.findall(line):
-            real_time_counts["exception"][match] += 1
-        for match in CUSTOM_PATTERN.findall(line):
-            real_time_counts["custom"][match.lower()] += 1
+# === REAL-TIME COUNTS (called from the tailer thread for each new line) ===
+def count_realtime_line(file_path, line_number, line):
+    counts = {k: Counter() for k in ("error", "exception", "custom")}
+    count_line(counts, line)
+    for ktype, keywords in counts.items():
+        for keyword, count in keywords.items():
+            push_metric(ktype, keyword, count, file_path, label_type="realtime")
 
-        if time.time() - last_push_time >= PUSH_INTERVAL:
-            for ktype, keywords in real_time_counts.items():
-                for keyword, count in keywords.items():
-                    push_metric(ktype, keyword, count, file_path, label_type="realtime")
-            real_time_counts = {k: Counter() for k in real_time_counts}
-            last_push_time = time.time()
+# === Follow a log file in real time from where its historical read stopped ===
+def tail_log_file(file_path, tailer, parts):
+    print(f"[*] Finished historical read, now tailing {file_path} in real-time...")
+    (_, (key, offset)), _ = parts[-1]
+    # Lines written since the read are picked up by the tailer's first sweep, none counted twice
+    tailer.add(file_path, resume=(key, offset, sum(line_count for _, line_count in parts)))
 
-# === List all matching log files using subprocess ===
+# === List all matching log files in one directory walk ===
 def list_log_files(directory):
-    """Find .log, .out, .err, nohup_log files recursively using 'find'."""
-    cmd = ["find", directory, "-type", "f",
-           "(", "-name", "*.log", "-o", "-name", "*.out", "-o", "-name", "*.err", "-o", "-name", "*nohup_log", ")"]
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, text=True)
-    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+    """Find .log, .out, .err, nohup_log files and their .gz/.bz2/.xz rotations recursively."""
+    return find_log_files(directory, LOG_EXTENSIONS, cache_file=DISCOVERY_CACHE_FILE)
 
 # === Start monitoring all files ===
 def monitor_directory(directory):
+    """Pushes historical counts for every file, then follows them all; returns the running tailer."""
     files = list_log_files(directory)
     print(f"[+] Found {len(files)} log files in {directory}")
-    for file_path in files:
-        threading.Thread(target=monitor_log_file, args=(file_path,), daemon=True).start()
+    # One tailer thread follows every file (no tail -F process or thread per file)
+    tailer = LogTailer(count_realtime_line, needles=MATCHER.prefilter_words())
+    # Compressed rotations counted on an earlier run are pushed from the cache, not re-read
+    cache = ArchiveCache(ARCHIVE_CACHE_FILE, signature=repr((ERROR_PATTERN, EXCEPTION_PATTERN, CUSTOM_PATTERN)))
+    files, cached = cache.split(files)
+    for file_path, counts in cached.items():
+        push_historical(file_path, [((counts, None), 0)])
+    # Historical reads run on every core (big files split into byte ranges) instead of
+    # one GIL-bound thread per file; each live file is then tailed from the offset its read reached
+    for file_path, parts in scan_in_parallel(files, count_range):
+        counts = push_historical(file_path, parts)
+        if counts is None:
+            continue
+        if compression(file_path):
+            cache.put(file_path, {ktype: dict(keywords) for ktype, keywords in counts.items()})
+        else:
+            tail_log_file(file_path, tailer, parts)
+    cache.save()
+    tailer.start()
+    return tailer
 
 # === MAIN ===
 if __name__ == "__main__":
@@ -127,4 +149,5 @@ if __name__ == "__main__":
     monitor_directory(sys.argv[1])
 
     while True:
-        time.sleep(10)
\ No newline at end of file
+        time.sleep(PUSH_INTERVAL)
+        METRICS.flush()
\ No newline at end of file
@@ -1,8 +1,7 @@
 from prometheus_client import CollectorRegistry, Gauge, push_to_gateway, delete_from_gateway
-import hashlib
+from log_checkpoint import CheckpointStore
 import os
 import re
-import subprocess
 
 # --- CONFIGURATION ---
 LOG_PATH = "/path/to/your/logs"
@@ -10,7 +9,7 @@ ENV = "prod"
 APP_NAME = "my-app"
 PUSHGATEWAY_URL = "http://localhost:9091"
 JOB_NAME = "log_monitor"
-PROCESSED_LOG_FILE = "processed_logs.txt"
+CHECKPOINT_FILE = "rm-d_checkpoints.json"  # byte offset per file, not a hash per matched line
 LOG_EXTENSIONS = ('.log', '.err', '.out', '.nohup_log')
 
 # --- REGEX PATTERNS ---
@@ -20,38 +19,16 @@ ERROR_PATTERNS = {
     'custom': re.compile(r'\b(sql|timeout|connection refused|denied)\b', re.IGNORECASE)
 }
 
-# --- Load processed entries ---
-def load_processed_entries():
-    seen = set()
-    if os.path.exists(PROCESSED_LOG_FILE):
-        with open(PROCESSED_LOG_FILE, 'r') as f:
-            seen = set(line.strip() for line in f.readlines())
-    return seen
-
-# --- Save processed hash entry ---
-def save_processed_entry(entry):
-    with open(PROCESSED_LOG_FILE, 'a') as f:
-        f.write(entry + '\n')
-
 # --- Process logs ---
-def process_log_file(filepath, seen_entries, gauge):
+def process_log_file(filepath, checkpoints, gauge):
     try:
-        result = subprocess.run(['cat', filepath], capture_output=True, text=True)
-        if result.returncode != 0:
-            return
-        lines = result.stdout.splitlines()
         folder, file_name = os.path.split(filepath)
 
-        for i, line in enumerate(lines, 1):
+        # Only the lines added since the last run; the checkpoint resumes with seek()
+        for i, line in checkpoints.read_new_lines(filepath):
             for error_type, pattern in ERROR_PATTERNS.items():
-                if pattern.search(line):
-                    match_text = pattern.search(line).group()
-                    hash_key = hashlib.md5(f"{filepath}:{i}:{line}".encode()).hexdigest()
-                    if hash_key in seen_entries:
-                        continue
-                    seen_entries.add(hash_key)
-                    save_processed_entry(hash_key)
-
+                match = pattern.search(line)
+                if match:
                     gauge.labels(
                         app_name=APP_NAME,
                         env=ENV,
@@ -59,14 +36,14 @@ def process_log_file(filepath, seen_entries, gauge):
                         folder=folder,
                         line_number=str(i),
                         error_type=error_type,
-                        error_message=match_text
+                        error_message=match.group()
                     ).set(1)
     except Exception as e:
         print(f"Error processing {filepath}: {e}")
 
 # --- Main ---
 def main():
-    seen = load_processed_entries()
+    checkpoints = CheckpointStore(CHECKPOINT_FILE)
     registry = CollectorRegistry()
     gauge = Gauge(
         'log_occurrence',
@@ -86,7 +63,7 @@ def main():
     for root, _, files in os.walk(LOG_PATH):
         for file in files:
             if file.endswith(LOG_EXTENSIONS):
-                process_log_file(os.path.join(root, file), seen, gauge)
+                process_log_file(os.path.join(root, file), checkpoints, gauge)
 
     # Push new data
     try:
@@ -94,6 +71,7 @@ def main():
         print("✅ Metrics pushed successfully")
     except Exception as e:
         print(f"❌ Push failed: {e}")
+    checkpoints.save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
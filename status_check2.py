@@ -2,6 +2,7 @@ import subprocess
 import requests
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
 from bs4 import BeautifulSoup
 
@@ -31,6 +32,8 @@ CONFIG = {
     },
 }
 
+AUTOSYS_WORKERS = 16  # autostatus calls in flight at once
+
 # Initialize Prometheus Gauges
 registry = CollectorRegistry()
 auto_status_gauge = Gauge(
@@ -44,26 +47,30 @@ webscrape_gauge = Gauge(
 )
 
 # Check Autosys Job Status
+def check_autosys_job(job):
+    try:
+        logger.info(f"Checking Autosys job status for {job}...")
+        result = subprocess.run(
+            ["autostatus", "-J", job],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        # Simulate job status: Success (0) or Failure (1)
+        job_status = 1 if "FAILURE" in result.stdout.upper() else 0
+        auto_status_gauge.labels(job_name=job).set(job_status)
+        logger.info(f"Job {job} status: {'FAILURE' if job_status == 1 else 'SUCCESS'}")
+    except subprocess.TimeoutExpired:
+        logger.error(f"Timeout occurred while checking job {job}")
+        auto_status_gauge.labels(job_name=job).set(0)
+    except Exception as e:
+        logger.error(f"Error checking job {job}: {e}")
+        auto_status_gauge.labels(job_name=job).set(0)
+
 def check_autosys_jobs(autosys_jobs):
-    for job in autosys_jobs:
-        try:
-            logger.info(f"Checking Autosys job status for {job}...")
-            result = subprocess.run(
-                ["autostatus", "-J", job],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            # Simulate job status: Success (0) or Failure (1)
-            job_status = 1 if "FAILURE" in result.stdout.upper() else 0
-            auto_status_gauge.labels(job_name=job).set(job_status)
-            logger.info(f"Job {job} status: {'FAILURE' if job_status == 1 else 'SUCCESS'}")
-        except subprocess.TimeoutExpired:
-            logger.error(f"Timeout occurred while checking job {job}")
-            auto_status_gauge.labels(job_name=job).set(0)
-        except Exception as e:
-            logger.error(f"Error checking job {job}: {e}")
-            auto_status_gauge.labels(job_name=job).set(0)
+    # One slow job no longer holds up the rest; worst case is ceil(N / AUTOSYS_WORKERS) x 10s, not N x 10s
+    with ThreadPoolExecutor(max_workers=AUTOSYS_WORKERS) as executor:
+        list(executor.map(check_autosys_job, autosys_jobs))
 
 # Check URL Status
 def check_urls(urls):
@@ -0,0 +1,19 @@
+from autorep_parser import parse_output
+
+HEADER = "Job Name" + " " * 57 + "Last Start           Last End             ST Run/Ntry Pri/Xit"
+UNDERLINE = "-" * 64 + " " + "-" * 20 + " " + "-" * 20 + " -- -------- -------"
+
+def row(name, status):
+    return f"{name:<64} {'01/02/2024 10:00:00':<20} {'01/02/2024 10:05:00':<20} {status} {'1/1':<8} 0"
+
+def test_repeated_header_is_not_a_job():
+    # autorep -J A%,B% prints one header block per pattern
+    output = "\n".join(["", HEADER, UNDERLINE, "", row("A_JOB", "SU"),
+                        "", HEADER, UNDERLINE, "", row("B_JOB", "FA"), ""])
+    rows = list(parse_output(output))
+    assert [(r.job_name, r.status) for r in rows] == [("A_JOB", "SU"), ("B_JOB", "FA")]
+    assert rows[1].last_start == "01/02/2024 10:00:00"
+
+def test_last_row_without_trailing_newline():
+    rows = list(parse_output("\n".join([HEADER, UNDERLINE, row("A_JOB", "SU"), row("B_JOB", "RU")])))
+    assert [r.job_name for r in rows] == ["A_JOB", "B_JOB"]
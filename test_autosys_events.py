@@ -0,0 +1,60 @@
+import os
+import sqlite3
+from autosys_events import EventLogSource, EventTableSource, JobStateFeed, CHANGE_STATUS
+from job_catalog import matches
+
+def log_line(job, status, when="10/17/2026 01:00:00"):
+    return f"[{when}]      CAUAJM_I_40245 EVENT: CHANGE_STATUS    STATUS: {status}    JOB: {job}\n"
+
+def test_log_source_reads_appended_events(tmp_path):
+    path = tmp_path / "event_demon.ACE"
+    path.write_text(log_line("OLD_JOB", "SUCCESS"))
+    source = EventLogSource(str(path))  # starts at the end: OLD_JOB is before the seed
+    with open(path, "a") as f:
+        f.write(log_line("PRD_A", "RUNNING") + "CAUAJM_I_10082 not an event\n" + log_line("PRD_A", "SUCCESS")[:60])
+    assert [(e.job_name, e.status) for e in source.poll()] == [("PRD_A", "RU")]
+    with open(path, "a") as f:
+        f.write(log_line("PRD_A", "SUCCESS")[60:])  # the rest of the half-written line
+    assert [(e.job_name, e.status) for e in source.poll()] == [("PRD_A", "SU")]
+
+def test_log_source_follows_rotation(tmp_path):
+    path = tmp_path / "event_demon.ACE"
+    path.write_text("")
+    source = EventLogSource(str(path))
+    with open(path, "a") as f:
+        f.write(log_line("PRD_A", "RUNNING"))
+    os.rename(path, tmp_path / "event_demon.ACE.1")
+    path.write_text(log_line("PRD_A", "FAILURE"))
+    assert [(e.job_name, e.status) for e in source.poll()] == [("PRD_A", "RU"), ("PRD_A", "FA")]
+
+def make_table(path):
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE ujo_proc_event (eoid INTEGER, job_name TEXT, event INTEGER, status INTEGER, event_time_gmt INTEGER)")
+    return conn
+
+def test_table_source_reads_rows_past_the_last_eoid(tmp_path):
+    conn = make_table(tmp_path / "events.db")
+    conn.execute("INSERT INTO ujo_proc_event VALUES (1, 'OLD_JOB', ?, 4, 100)", (CHANGE_STATUS,))
+    source = EventTableSource(conn)  # marks MAX(eoid) = 1
+    conn.executemany("INSERT INTO ujo_proc_event VALUES (?, ?, ?, ?, ?)", [
+        (2, 'PRD_A', CHANGE_STATUS, 1, 200),
+        (3, 'PRD_A', 106, 0, 201),  # not a status change
+        (4, 'PRD_A', CHANGE_STATUS, 5, 300),
+    ])
+    assert [(e.job_name, e.status, e.timestamp) for e in source.poll()] == [("PRD_A", "RU", 200.0), ("PRD_A", "FA", 300.0)]
+    assert source.poll() == []
+
+def test_feed_reports_transitions_for_matching_jobs():
+    feed = JobStateFeed({"PRD_A": "SU"})
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE ujo_proc_event (eoid INTEGER, job_name TEXT, event INTEGER, status INTEGER, event_time_gmt INTEGER)")
+    conn.executemany("INSERT INTO ujo_proc_event VALUES (?, ?, ?, ?, ?)", [
+        (1, 'PRD_A', CHANGE_STATUS, 4, 1), (2, 'PRD_B', CHANGE_STATUS, 1, 2), (3, 'DEV_C', CHANGE_STATUS, 1, 3)])
+    events = EventTableSource(conn, from_start=True).poll()
+    transitions = feed.apply(events, lambda job: matches(job, "PRD_A, PRD_B"))
+    assert [(event.job_name, previous) for event, previous in transitions] == [("PRD_B", None)]
+
+def test_matches_all_and_comma_lists():
+    assert matches("ANY_JOB", "ALL")
+    assert matches("PRD_OPS_X", "PRD_FIN_%,PRD_OPS_%")
+    assert not matches("DEV_X", "PRD_FIN_%, PRD_OPS_%")
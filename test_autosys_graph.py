@@ -0,0 +1,26 @@
+from autosys_graph import JobGraph
+
+JIL = """
+insert_job: PRD_BOX   job_type: b
+insert_job: PRD_A   job_type: c
+box_name: PRD_BOX
+insert_job: PRD_B   job_type: CMD
+box_name: PRD_BOX
+condition: s(PRD_A)
+insert_job: PRD_INNER   job_type: Box
+box_name: PRD_BOX
+insert_job: PRD_C   job_type: cmd
+box_name: PRD_INNER
+"""
+
+def test_short_and_mixed_case_job_types_are_normalised():
+    graph = JobGraph()
+    graph.load(JIL)
+    assert [graph.defs[job].job_type for job in ("PRD_BOX", "PRD_A", "PRD_INNER", "PRD_C")] == ["BOX", "CMD", "BOX", "CMD"]
+
+def test_critical_path_through_a_short_type_box():
+    graph = JobGraph()
+    graph.load(JIL)
+    total, path = graph.critical_path("PRD_BOX", {"PRD_A": 60, "PRD_B": 30, "PRD_C": 200})
+    assert (total, path) == (200, ["PRD_C", "PRD_INNER"])
+    assert graph.critical_path("PRD_BOX", {"PRD_A": 60, "PRD_B": 30, "PRD_C": 50}) == (90, ["PRD_A", "PRD_B"])
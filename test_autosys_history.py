@@ -0,0 +1,32 @@
+import time
+from datetime import datetime
+from autorep_parser import AutorepRow
+from autosys_history import HistoryStore
+
+NOW = int(time.time())
+
+def run(job, days_ago, status="SU"):
+    started = datetime.fromtimestamp(NOW - days_ago * 86400).strftime("%Y-%m-%d %H:%M:%S")
+    return AutorepRow(job, started, started, status, "1/1", "0")
+
+def load(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    rows = [run("PRD_FIN_A", 1, "FA"), run("PRD_FIN_A", 10), run("PRD_OPS_B", 2), run("PRD_REP_C", 3)]
+    store.append_runs("ALL", rows, NOW)
+    return store, rows
+
+def test_all_matches_every_job(tmp_path):
+    store, rows = load(tmp_path)
+    stats = store.window_stats(["ALL"], {"week": 7, "month": 30}, NOW)
+    assert sorted(stats) == ["PRD_FIN_A", "PRD_OPS_B", "PRD_REP_C"]
+    assert stats["PRD_FIN_A"]["week"]["failures"] == 1
+    assert stats["PRD_FIN_A"]["month"]["other_statuses"] == {"SU": 1}
+    # only each job's latest stored run is read again
+    assert store.append_runs("ALL", rows, NOW) == 3
+
+def test_comma_joined_patterns(tmp_path):
+    store, rows = load(tmp_path)
+    stats = store.window_stats(["PRD_FIN_%, PRD_OPS_B"], {"month": 30}, NOW)
+    assert sorted(stats) == ["PRD_FIN_A", "PRD_OPS_B"]
+    assert [job for job, _, _ in store.finished_runs(["PRD_OPS_B,PRD_REP_%"])] == ["PRD_REP_C", "PRD_OPS_B"]
+    assert store.append_runs("PRD_FIN_%,PRD_OPS_B", rows[:3], NOW) == 2
@@ -1,14 +1,16 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 import subprocess
-import re
-from datetime import datetime, timedelta
+from autorep_parser import parse_lines
+from jobsched_env import get_jobsched_env
+from autosys_history import HistoryStore, MAX_DAYS
 
 app = FastAPI()
 
 class JobPatternsRequest(BaseModel):
     job_patterns: List[str]
+    time_ranges: Optional[Dict[str, int]] = None  # {window_name: days}; defaults to TIME_RANGES
 
 TIME_RANGES = {
     "past_3_months": 90,
@@ -18,16 +20,11 @@ TIME_RANGES = {
     "last_5_days": 5
 }
 
-# ✅ Load Module Once at Startup
-def load_jobsched_module():
-    """Loads jobsched module once at startup."""
-    try:
-        subprocess.run(["module", "load", "jobsched/QNA"], shell=True, check=True)
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Module Load Failed: {str(e)}")
+# ✅ Load module once at startup and keep its environment for every autorep call
+JOBSCHED_ENV = get_jobsched_env()
 
-# ✅ Load module at startup
-load_jobsched_module()
+# ✅ Local run-history store, refreshed incrementally by /stats/
+HISTORY = HistoryStore()
 
 def run_autorep(job_patterns, history=False):
     """Runs autorep command using subprocess."""
@@ -37,7 +34,7 @@ def run_autorep(job_patterns, history=False):
         command.append("90")
 
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, check=True)
+        result = subprocess.run(command, capture_output=True, text=True, check=True, env=JOBSCHED_ENV)
         output = result.stdout.strip()
 
         if "ERROR" in output or not output:
@@ -51,55 +48,16 @@ def run_autorep(job_patterns, history=False):
 def parse_autorep_output(output):
     """Parses autorep command output."""
     jobs = {}
-    found_header = False
-
-    for line in output:
-        if "---" in line:
-            found_header = True
-            continue
-
-        if not found_header:
-            continue
 
-        match = re.match(r"(\S+)\s+(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}|\-)\s+(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}|\-)\s+(\S+)", line)
-
-        if match:
-            job_name, last_start, last_end, status = match.groups()
-            jobs[job_name] = {
-                "last_start": last_start if last_start != "-" else "N/A",
-                "last_end": last_end if last_end != "-" else "N/A",
-                "status": status
-            }
+    for row in parse_lines(output):
+        jobs[row.job_name] = {
+            "last_start": row.last_start if row.last_start and not row.last_start.startswith("-") else "N/A",
+            "last_end": row.last_end if row.last_end and not row.last_end.startswith("-") else "N/A",
+            "status": row.status
+        }
 
     return jobs
 
-def process_job_stats(jobs):
-    """Processes job failure statistics."""
-    job_stats = {}
-
-    for job, runs in jobs.items():
-        job_stats[job] = {k: {"failures": 0, "other_statuses": {}} for k in TIME_RANGES}
-
-        last_start = runs["last_start"]
-        status = runs["status"]
-
-        if last_start == "N/A":
-            continue  # Ignore jobs with no valid last start time
-
-        try:
-            job_date = datetime.strptime(last_start, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            continue  # Ignore invalid date formats
-
-        for period, days in TIME_RANGES.items():
-            if job_date >= datetime.now() - timedelta(days=days):
-                if status in ["FA", "FAILURE"]:  # Failure statuses
-                    job_stats[job][period]["failures"] += 1
-                else:  # Other statuses
-                    job_stats[job][period]["other_statuses"][status] = job_stats[job][period]["other_statuses"].get(status, 0) + 1
-
-    return job_stats
-
 @app.post("/jobs/")
 def get_jobs(request: JobPatternsRequest):
     try:
@@ -111,10 +69,15 @@ def get_jobs(request: JobPatternsRequest):
 
 @app.post("/stats/")
 def get_job_statistics(request: JobPatternsRequest):
+    time_ranges = request.time_ranges or TIME_RANGES
+    # The store only holds MAX_DAYS of history; a longer window would be silently cut short
+    invalid = [name for name, days in time_ranges.items() if not 0 < days <= MAX_DAYS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Time ranges must be 1-{MAX_DAYS} days: {', '.join(invalid)}")
     try:
-        output = run_autorep(request.job_patterns, history=True)
-        jobs = parse_autorep_output(output)
-        job_stats = process_job_stats(jobs)
+        # Only runs newer than what's already stored are fetched from autorep
+        HISTORY.refresh(request.job_patterns)
+        job_stats = HISTORY.window_stats(request.job_patterns, time_ranges)
         return {"job_statistics": job_stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
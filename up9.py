@@ -0,0 +1,134 @@
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+import asyncio
+import subprocess
+import time
+from autorep_async import AutorepPool
+from autosys_history import HistoryStore, TIME_RANGES, MAX_DAYS
+from jobsched_env import get_jobsched_env
+from job_catalog import JobCatalog
+
+CACHE_TTL = 30          # seconds a /jobs/ or /stats/ result is reused for the same patterns
+CACHE_MAX_ENTRIES = 1024
+
+class JobPatternsRequest(BaseModel):
+    job_patterns: List[str]
+    time_ranges: Optional[Dict[str, int]] = None  # {window_name: days}; defaults to TIME_RANGES
+
+class TTLCache:
+    """Keeps results for `ttl` seconds; concurrent misses on one key share one computation."""
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}
+        self.inflight = {}
+
+    async def get(self, key, compute):
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._store(key, done))
+        # shield: one client hanging up must not cancel the work other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _store(self, key, task):
+        self.inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return  # failures aren't cached, the next request retries
+        now = time.monotonic()
+        if len(self.entries) >= self.max_entries:
+            self.entries = {k: v for k, v in self.entries.items() if v[0] > now}
+        self.entries[key] = (now + self.ttl, task.result())
+
+# ✅ One autorep pool, history store and cache for the whole app.
+# The pool, store and catalog are built at startup, not on import: the pool's
+# `module load` capture can take minutes and importing the app shouldn't run it.
+POOL = None
+HISTORY = None
+CACHE = TTLCache()
+CATALOG = None
+
+@asynccontextmanager
+async def lifespan(app):
+    global POOL, HISTORY, CATALOG
+    env = await asyncio.to_thread(get_jobsched_env)
+    POOL = AutorepPool(env=env)
+    HISTORY = await asyncio.to_thread(HistoryStore)
+    CATALOG = JobCatalog()
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+async def normalize_patterns(job_patterns):
+    """Same patterns in any order / with duplicates -> the same cache key.
+
+    Patterns that match no job in the catalog are rejected before autorep is run.
+    """
+    patterns = tuple(sorted({pattern.strip() for pattern in job_patterns if pattern.strip()}))
+    if not patterns:
+        raise HTTPException(status_code=400, detail="No job patterns given.")
+
+    try:
+        await asyncio.to_thread(CATALOG.refresh_if_stale)
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"WARNING: job catalog refresh failed, skipping pattern validation: {e}")
+        return patterns
+    unknown = CATALOG.unknown(patterns)
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"No jobs match: {', '.join(unknown)}")
+    return patterns
+
+async def fetch_jobs(patterns):
+    """Last start/end/status of every job matching the patterns, one autorep call."""
+    jobs = {}
+    for row in await POOL.rows(['-J', ','.join(patterns)]):
+        jobs[row.job_name] = {
+            "last_start": row.last_start if row.last_start and not row.last_start.startswith("-") else "N/A",
+            "last_end": row.last_end if row.last_end and not row.last_end.startswith("-") else "N/A",
+            "status": row.status
+        }
+    return jobs
+
+async def refresh_history(pattern, now):
+    days = await asyncio.to_thread(HISTORY.lookback_days, pattern, MAX_DAYS, now)
+    rows = await POOL.rows(['-J', pattern, '-r', str(days)])
+    await asyncio.to_thread(HISTORY.append_runs, pattern, rows, now)
+
+async def fetch_stats(patterns, time_ranges):
+    """Refreshes history for every pattern concurrently, then reads all windows in one query."""
+    now = int(time.time())
+    await asyncio.gather(*(refresh_history(pattern, now) for pattern in patterns))
+    await asyncio.to_thread(HISTORY.prune, MAX_DAYS, now)
+    return await asyncio.to_thread(HISTORY.window_stats, list(patterns), time_ranges, now)
+
+@app.post("/jobs/")
+async def get_jobs(request: JobPatternsRequest):
+    patterns = await normalize_patterns(request.job_patterns)
+    try:
+        jobs = await CACHE.get(("jobs", patterns), lambda: fetch_jobs(patterns))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"jobs": jobs}
+
+@app.post("/stats/")
+async def get_job_statistics(request: JobPatternsRequest):
+    time_ranges = request.time_ranges or TIME_RANGES
+    # The store only holds MAX_DAYS of history; a longer window would be silently cut short
+    invalid = [name for name, days in time_ranges.items() if not 0 < days <= MAX_DAYS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Time ranges must be 1-{MAX_DAYS} days: {', '.join(invalid)}")
+    patterns = await normalize_patterns(request.job_patterns)
+    key = ("stats", patterns, tuple(sorted(time_ranges.items())))
+    try:
+        job_stats = await CACHE.get(key, lambda: fetch_stats(patterns, time_ranges))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"job_statistics": job_stats}
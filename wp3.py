@@ -1,14 +1,16 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 import os
 import re
-from datetime import datetime, timedelta
+import time
+from job_windows import parse_runs, aggregate_windows
 
 app = FastAPI()
 
 class JobPatternsRequest(BaseModel):
     job_patterns: List[str]
+    time_ranges: Optional[Dict[str, int]] = None  # {window_name: days}; defaults to TIME_RANGES
 
 TIME_RANGES = {
     "past_3_months": 90,
@@ -74,30 +76,15 @@ def parse_autorep_output(output):
 
     return jobs
 
-def process_job_stats(jobs):
+def process_job_stats(jobs, time_ranges=TIME_RANGES):
     """Processes job failure statistics."""
     job_stats = {}
+    now = time.time()  # one "now" for every window of every job
 
     for job, runs in jobs.items():
-        job_stats[job] = {k: {"failures": 0, "other_statuses": {}} for k in TIME_RANGES}
-
-        last_start = runs["last_start"]
-        status = runs["status"]
-
-        if last_start == "N/A":
-            continue  # Ignore jobs with no valid last start time
-
-        try:
-            job_date = datetime.strptime(last_start, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            continue  # Ignore invalid date formats
-
-        for period, days in TIME_RANGES.items():
-            if job_date >= datetime.now() - timedelta(days=days):
-                if status in ["FA", "FAILURE"]:  # Failure statuses
-                    job_stats[job][period]["failures"] += 1
-                else:  # Other statuses
-                    job_stats[job][period]["other_statuses"][status] = job_stats[job][period]["other_statuses"].get(status, 0) + 1
+        # Dates are parsed once per run; invalid / "N/A" starts are dropped by parse_runs
+        parsed = parse_runs([{"date": runs["last_start"], "status": runs["status"]}], "date", "%Y-%m-%d %H:%M:%S")
+        job_stats[job] = aggregate_windows(parsed, time_ranges, now)
 
     return job_stats
 
@@ -115,7 +102,7 @@ def get_job_statistics(request: JobPatternsRequest):
     try:
         output = run_autorep(request.job_patterns, history=True)
         jobs = parse_autorep_output(output)
-        job_stats = process_job_stats(jobs)
+        job_stats = process_job_stats(jobs, request.time_ranges or TIME_RANGES)
         return {"job_statistics": job_stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file